@@ -0,0 +1,52 @@
+"""
+Compare saving and loading transactions as plain, gzip, bzip2 and xz
+compressed CSV: wall time for each direction and the bytes that have to
+be read from disk on load (the file size).
+
+Run from the project root:
+    python -m benchmarks.bench_codecs [rows]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+from benchmarks.synthetic import ensure_transactions_csv
+from utils.analysis import load_transactions, replace_csv
+from utils.fast_parser import load_transactions_fast
+
+EXTENSIONS = ['', '.gz', '.bz2', '.xz']
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    source = ensure_transactions_csv(f"bench_data/transactions_{rows}.csv", rows)
+    with contextlib.redirect_stdout(io.StringIO()):
+        table = load_transactions_fast(source)
+
+    print(f"{rows:,} rows")
+    print(f"{'codec':<8} {'size MB':>9} {'ratio':>7} {'save s':>8} {'load s':>8} {'load MB/s read':>15}")
+    plain_size = None
+    for extension in EXTENSIONS:
+        path = f"bench_data/codec_output.csv{extension}"
+
+        start = time.perf_counter()
+        replace_csv(table, path)
+        save_time = time.perf_counter() - start
+        size = os.path.getsize(path)
+        plain_size = plain_size or size
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            loaded = load_transactions(path, use_snapshot=False, journal=False)
+        load_time = time.perf_counter() - start
+        assert len(loaded) == len(table)
+
+        print(f"{extension.lstrip('.') or 'none':<8} {size / 2**20:>9.1f} {plain_size / size:>6.1f}x "
+              f"{save_time:>8.2f} {load_time:>8.2f} {size / 2**20 / load_time:>15.1f}")
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
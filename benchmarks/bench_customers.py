@@ -0,0 +1,65 @@
+"""
+Time the per-customer summary and its top-N/bottom-N selection on a
+generated table (10M rows over 1M customers by default), and report the
+memory the summary holds.
+
+The table is built straight from random columns, so CSV parsing is not
+part of the timing. The summary's memory depends on the number of
+customers only. Run from the project root:
+    python -m benchmarks.bench_customers [rows] [customers]
+"""
+from array import array
+from datetime import date
+import random
+import sys
+import time
+
+from utils.customers import CustomerSummary
+from utils.transaction_table import TransactionTable
+
+
+def random_table(rows, customers, seed=42):
+    rng = random.Random(seed)
+    start = date(2015, 1, 1).toordinal()
+    columns = [
+        array('q', range(1, rows + 1)),
+        array('i', (start + rng.randrange(3650) for _ in range(rows))),
+        array('q', (rng.randint(1, customers) for _ in range(rows))),
+        array('q', (rng.randint(1, 999999) for _ in range(rows))),
+        array('b', (rng.randrange(3) for _ in range(rows))),
+        array('i', bytes(4 * rows))
+    ]
+    return TransactionTable.from_columns(columns, ['Generated.'])
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    customers = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    start = time.perf_counter()
+    table = random_table(rows, customers)
+    print(f"generated {rows:,} rows over {customers:,} customers in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    summary = CustomerSummary()
+    summary.add_columns(table.customers, table.dates, table.types, table.cents)
+    elapsed = time.perf_counter() - start
+    print(f"summary: {elapsed:.2f}s ({elapsed / rows * 1e9:.0f} ns per row), {len(summary):,} customers, "
+          f"{summary.memory_usage() / 2**20:.0f} MB (table: {table.memory_usage() / 2**20:.0f} MB)")
+
+    for by in ('net', 'count'):
+        start = time.perf_counter()
+        top = summary.top(10, by)
+        bottom = summary.bottom(10, by)
+        heap_time = time.perf_counter() - start
+
+        key = summary._metric(by)
+        start = time.perf_counter()
+        ranked = sorted(range(len(summary)), key=key)
+        sort_time = time.perf_counter() - start
+        assert [key(summary.slots[r['customer_id']]) for r in top] == [key(s) for s in ranked[::-1][:10]]
+        assert [key(summary.slots[r['customer_id']]) for r in bottom] == [key(s) for s in ranked[:10]]
+        print(f"top/bottom 10 by {by:<5}: {heap_time:.2f}s with heaps vs {sort_time:.2f}s for a full sort")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Compare load_transactions() with load_transactions_fast().
+
+Run from the project root:
+    python -m benchmarks.bench_fast_parser [rows]
+"""
+import sys
+import time
+
+from benchmarks.synthetic import ensure_transactions_csv
+from utils.analysis import iter_transactions
+from utils.fast_parser import iter_transactions_fast
+
+
+def time_loader(label, iterator_factory, filename, rows):
+    start = time.perf_counter()
+    count = sum(1 for _ in iterator_factory(filename))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28}: {count:>10,} rows in {elapsed:6.2f}s  ({count / elapsed:>10,.0f} rows/sec)")
+    return elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    filename = ensure_transactions_csv(f"bench_data/transactions_{rows}.csv", rows)
+
+    baseline = time_loader("DictReader + strptime", iter_transactions, filename, rows)
+    fast = time_loader("csv.reader + date cache", iter_transactions_fast, filename, rows)
+    print(f"Speedup: {baseline / fast:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
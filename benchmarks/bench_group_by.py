@@ -0,0 +1,115 @@
+"""
+Time group_by() against hand-written per-row loops that compute the same
+summaries (5M rows by default), and check that both give the same result.
+
+Each loop is written the way the summaries used to be: one Python
+iteration per row that builds its grouping key (strftime, isocalendar,
+tuples) and updates a dictionary. Run from the project root:
+    python -m benchmarks.bench_group_by [rows]
+"""
+from collections import defaultdict
+import contextlib
+from datetime import date, datetime
+import io
+import sys
+import time
+
+from benchmarks.synthetic import ensure_transactions_csv
+from utils.aggregates import Aggregates
+from utils.fast_parser import load_transactions_fast
+from utils.grouping import group_by
+from utils.transaction_table import TRANSACTION_TYPES
+
+
+def loop_type_totals(table):
+    totals = defaultdict(int)
+    for type_code, cents in zip(table.types, table.cents):
+        totals[TRANSACTION_TYPES[type_code]] += cents
+    return dict(totals)
+
+
+def loop_monthly(table):
+    summary = defaultdict(int)
+    for ordinal, type_code, cents in zip(table.dates, table.types, table.cents):
+        month = datetime.fromordinal(ordinal).strftime('%Y-%m')
+        summary[(month, TRANSACTION_TYPES[type_code])] += abs(cents)
+    return dict(summary)
+
+
+def loop_day_buckets(table):
+    aggregates = Aggregates()
+    for ordinal, type_code, cents in zip(table.dates, table.types, table.cents):
+        aggregates.add(ordinal, type_code, cents)
+    return aggregates.days
+
+
+def loop_weekly_customers(table):
+    customers = defaultdict(set)
+    for ordinal, customer_id in zip(table.dates, table.customers):
+        year, week, weekday = date.fromordinal(ordinal).isocalendar()
+        customers[f"{year:04d}-W{week:02d}"].add(customer_id)
+    return {week: len(ids) for week, ids in customers.items()}
+
+
+def loop_quarterly_mean(table):
+    sums, counts = defaultdict(int), defaultdict(int)
+    for ordinal, type_code, cents in zip(table.dates, table.types, table.cents):
+        day = date.fromordinal(ordinal)
+        key = (f"{day.year:04d}-Q{(day.month - 1) // 3 + 1}", TRANSACTION_TYPES[type_code])
+        sums[key] += cents
+        counts[key] += 1
+    return {key: sums[key] / counts[key] for key in sums}
+
+
+def loop_customer_counts(table):
+    counts = defaultdict(int)
+    for customer_id in table.customers:
+        counts[customer_id] += 1
+    return dict(counts)
+
+
+def day_buckets(table):
+    aggregates = Aggregates()
+    aggregates.add_columns(table.dates, table.types, table.cents)
+    return aggregates.days
+
+
+# (label, loop, group_by equivalent)
+QUERIES = [
+    ("totals by type", loop_type_totals,
+     lambda t: {k: g['total'] for k, g in group_by(t, 'type', {'total': ('sum', 'amount')}).items()}),
+    ("monthly totals by type", loop_monthly,
+     lambda t: {k: g['total'] for k, g in group_by(t, ('month', 'type'), {'total': ('sum', 'abs_amount')}).items()}),
+    ("day/type buckets (aggregates)", loop_day_buckets, day_buckets),
+    ("distinct customers per week", loop_weekly_customers,
+     lambda t: {k: g['customers'] for k, g in group_by(t, 'week', {'customers': ('distinct', 'customer_id')}).items()}),
+    ("mean amount per quarter/type", loop_quarterly_mean,
+     lambda t: {k: g['mean'] for k, g in group_by(t, ('quarter', 'type'), {'mean': ('mean', 'amount')}).items()}),
+    ("transactions per customer", loop_customer_counts,
+     lambda t: {k: g['count'] for k, g in group_by(t, 'customer_id', {'count': 'count'}).items()}),
+]
+
+
+def timed(function, table):
+    start = time.perf_counter()
+    result = function(table)
+    return result, time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    source = ensure_transactions_csv(f"bench_data/transactions_{rows}.csv", rows)
+    with contextlib.redirect_stdout(io.StringIO()):
+        table = load_transactions_fast(source)
+
+    print(f"Grouping {len(table):,} rows")
+    for label, loop, query in QUERIES:
+        expected, loop_time = timed(loop, table)
+        result, query_time = timed(query, table)
+        same = "same result" if result == expected else "RESULTS DIFFER"
+        print(f"{label:<30}: loop {loop_time:6.2f}s  group_by {query_time:6.2f}s  "
+              f"({loop_time / query_time:4.1f}x)  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Measure how load_transactions_parallel() scales with the number of workers.
+
+Run from the project root:
+    python -m benchmarks.bench_parallel_loader [rows]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+from benchmarks.synthetic import ensure_transactions_csv
+from utils.parallel_loader import load_transactions_parallel
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    filename = ensure_transactions_csv(f"bench_data/transactions_{rows}.csv", rows)
+    cores = os.cpu_count() or 1
+    worker_counts = [n for n in (1, 2, 4, 8, 16, 32) if n <= cores] or [1]
+
+    print(f"{rows:,} rows, {cores} CPU core(s)")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            table = load_transactions_parallel(filename, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"workers={workers:<3}: {len(table):>10,} rows in {elapsed:6.2f}s "
+              f"({len(table) / elapsed:>10,.0f} rows/sec, {baseline / elapsed:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Export transactions to the fixed-width record file, check that the round
+trip back to CSV is byte-identical, and time random access by position
+and by transaction ID (binary search).
+
+Run from the project root:
+    python -m benchmarks.bench_record_file [rows]
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+from benchmarks.synthetic import ensure_transactions_csv
+from utils.bulk_writer import write_transactions
+from utils.fast_parser import load_transactions_fast
+from utils.record_file import RecordFile, export_records, import_records
+
+LOOKUPS = 100_000
+
+
+def csv_bytes(transactions):
+    out = io.StringIO(newline='')
+    write_transactions(out, transactions)
+    return out.getvalue()
+
+
+def time_lookups(label, lookup, keys):
+    start = time.perf_counter()
+    for key in keys:
+        lookup(key)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34}: {elapsed / len(keys) * 1e6:6.2f} µs per lookup")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    source = ensure_transactions_csv(f"bench_data/transactions_{rows}.csv", rows)
+    with contextlib.redirect_stdout(io.StringIO()):
+        table = load_transactions_fast(source)
+    path = "bench_data/records.rec"
+
+    start = time.perf_counter()
+    export_records(table, path)
+    print(f"export: {time.perf_counter() - start:.2f}s  "
+          f"({os.path.getsize(path) / 2**20:.1f} MB records + "
+          f"{os.path.getsize(path + '.heap') / 2**20:.1f} MB heap, CSV {os.path.getsize(source) / 2**20:.1f} MB)")
+    start = time.perf_counter()
+    imported = import_records(path)
+    print(f"import: {time.perf_counter() - start:.2f}s")
+    print(f"round trip byte-identical: {csv_bytes(imported) == csv_bytes(table)}")
+
+    positions = [random.randrange(rows) for _ in range(LOOKUPS)]
+    with RecordFile(path) as records:
+        time_lookups("record by position", records.__getitem__, positions)
+        ids = [table.ids[i] for i in positions]
+        time_lookups("record by ID (ascending IDs)", records.find, ids)
+
+    # Shuffle the rows so lookups go through the .idx file
+    order = list(range(rows))
+    random.shuffle(order)
+    export_records(table.take(order), path)
+    with RecordFile(path) as records:
+        time_lookups("record by ID (shuffled, via .idx)", records.find, ids)
+
+    for name in (path, path + '.heap', path + '.idx'):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Time the rollup cube: building it, drilling into every year, quarter and
+month from it, and patching it on appends and deletes, against rescanning
+the rows with group_by() for each drill-down.
+
+Run from the project root:
+    python -m benchmarks.bench_rollup [rows]
+"""
+import contextlib
+from datetime import datetime
+import io
+import sys
+import time
+
+from benchmarks.synthetic import ensure_transactions_csv
+from utils.aggregates import aggregate
+from utils.fast_parser import load_transactions_fast
+from utils.grouping import group_by
+
+# group_by() key of the sub-periods each level drills into
+CHILD_KEYS = {'year': 'quarter', 'quarter': 'month', 'month': 'date'}
+
+
+def drill_by_rescan(table, level, period):
+    """
+    One drill-down without the cube: group every row by sub-period and keep
+    the sub-periods of `period`.
+    """
+    groups = group_by(table, (CHILD_KEYS[level], 'type'), {'total': ('sum', 'amount')})
+    if level == 'month':
+        return {key: g for key, g in groups.items() if key[0].strftime('%Y-%m') == period}
+    return {key: g for key, g in groups.items() if key[0].startswith(period)}
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    source = ensure_transactions_csv(f"bench_data/transactions_{rows}.csv", rows)
+    with contextlib.redirect_stdout(io.StringIO()):
+        table = load_transactions_fast(source)
+    print(f"Rollup cube over {len(table):,} rows")
+
+    start = time.perf_counter()
+    aggregates = aggregate(table)
+    scan_time = time.perf_counter() - start
+    start = time.perf_counter()
+    cube = aggregates.rollup()
+    build_time = time.perf_counter() - start
+    print(f"day buckets (one scan of the rows): {scan_time:6.2f}s")
+    print(f"cube rolled up from the buckets   : {build_time * 1000:6.1f}ms  "
+          f"({sum(len(cells) for cells in cube.cells.values()):,} cells)")
+
+    queries = [(level, period) for level in CHILD_KEYS for period in cube.periods(level)]
+    start = time.perf_counter()
+    for level, period in queries:
+        cube.drill(level, period)
+    cube_time = time.perf_counter() - start
+    print(f"{f'{len(queries)} drill-downs from the cube':<34}: {cube_time * 1000:6.1f}ms "
+          f"({cube_time / len(queries) * 1e6:.0f} µs each)")
+
+    sample = queries[:: max(1, len(queries) // 5)]
+    start = time.perf_counter()
+    for level, period in sample:
+        drill_by_rescan(table, level, period)
+    rescan_time = (time.perf_counter() - start) / len(sample)
+    print(f"one drill-down by rescanning      : {rescan_time:6.2f}s")
+
+    changes = 10_000
+    start = time.perf_counter()
+    for i in range(changes):
+        table.append({'transaction_id': 10**9 + i, 'date': datetime(2020, 1 + i % 12, 1 + i % 28),
+                      'customer_id': 1, 'amount': 12.5, 'type': 'credit', 'description': 'Benchmark.'})
+    for i in range(changes):
+        del table[len(table) - 1]
+    patch_time = time.perf_counter() - start
+    print(f"{f'{changes:,} appends + deletes (patched)':<34}: {patch_time:6.2f}s "
+          f"({patch_time / (2 * changes) * 1e6:.0f} µs per change)")
+    print(f"cube still matches a full rebuild : {aggregate(table).rollup() is cube and cube == type(cube).from_days(aggregates.days)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare the old csv.DictWriter save loop with the bulk writer used by
+save_transactions(), and check that both produce identical bytes.
+
+Run from the project root:
+    python -m benchmarks.bench_save [rows]
+"""
+import contextlib
+import csv
+import io
+import os
+import sys
+import time
+
+from benchmarks.synthetic import ensure_transactions_csv
+from utils.bulk_writer import write_transactions
+from utils.fast_parser import load_transactions_fast
+
+
+def write_dictwriter(f, transactions):
+    """
+    The per-row save loop save_transactions() used before the bulk writer.
+    """
+    writer = csv.DictWriter(f, fieldnames=['transaction_id', 'date', 'customer_id', 'amount', 'type', 'description'])
+    writer.writeheader()
+    for t in transactions:
+        writer.writerow({
+            'transaction_id': t['transaction_id'],
+            'date': t['date'].strftime('%Y-%m-%d'),
+            'customer_id': t['customer_id'],
+            'amount': t['amount'],
+            'type': t['type'],
+            'description': t['description']
+        })
+
+
+def time_writer(label, writer, transactions, path):
+    start = time.perf_counter()
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer(f, transactions)
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(path) / 2**20
+    print(f"{label:<32}: {elapsed:6.2f}s  {len(transactions) / elapsed:>10,.0f} rows/s  "
+          f"{size_mb / elapsed:7.1f} MB/s")
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    source = ensure_transactions_csv(f"bench_data/transactions_{rows}.csv", rows)
+    with contextlib.redirect_stdout(io.StringIO()):
+        table = load_transactions_fast(source)
+    dicts = [dict(t) for t in table]
+    out = "bench_data/save_output.csv"
+
+    print(f"Saving {rows:,} rows")
+    expected = time_writer("DictWriter (TransactionTable)", write_dictwriter, table, out)
+    same = time_writer("bulk writer (TransactionTable)", write_transactions, table, out) == expected
+    expected = time_writer("DictWriter (list of dicts)", write_dictwriter, dicts, out)
+    same = time_writer("bulk writer (list of dicts)", write_transactions, dicts, out) == expected and same
+    os.remove(out)
+    print(f"Byte-identical output: {same}")
+
+
+if __name__ == "__main__":
+    main()
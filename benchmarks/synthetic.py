@@ -0,0 +1,48 @@
+import csv
+import os
+import random
+from datetime import date, timedelta
+
+# -----------------------------------------------------
+# Synthetic transaction files for the benchmark scripts
+# -----------------------------------------------------
+WORDS = ("market coffee rent salary grocery fuel online store transfer refund "
+         "utility phone travel hotel dinner lunch gym insurance book music").split()
+
+
+def write_transactions_csv(path, rows, seed=42, distinct_descriptions=5000,
+                           start=date(2015, 1, 1), days=3650):
+    """
+    Write a CSV with the same columns as data/financial_transactions.csv.
+    Uses a fixed seed so repeated benchmark runs read identical data.
+    Returns the path that was written.
+    """
+    rng = random.Random(seed)
+    descriptions = [" ".join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize() + "."
+                    for _ in range(distinct_descriptions)]
+    dates = [(start + timedelta(days=d)).strftime('%Y-%m-%d') for d in range(days)]
+    types = ('credit', 'debit', 'transfer')
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['transaction_id', 'date', 'customer_id', 'amount', 'type', 'description'])
+        for i in range(1, rows + 1):
+            writer.writerow([
+                i,
+                rng.choice(dates),
+                rng.randint(1, 100000),
+                f"{rng.randint(1, 999999) / 100:.2f}",
+                rng.choice(types),
+                rng.choice(descriptions)
+            ])
+    return path
+
+
+def ensure_transactions_csv(path, rows, **kwargs):
+    """
+    Reuse an existing synthetic file if present, otherwise generate it.
+    """
+    if not os.path.exists(path):
+        write_transactions_csv(path, rows, **kwargs)
+    return path
@@ -1,11 +1,13 @@
 # menu.py
 
 from utils.analysis import (
-    load_transactions,
-    save_transactions,
     analyze_finances,
     generate_report,
-    calculate_monthly_summary
+    calculate_monthly_summary,
+    print_monthly_summary,
+    analyze_customers,
+    drill_down_summary,
+    compact_transactions
 )
 from utils.transaction_ops import (
     add_transaction,
@@ -13,12 +15,24 @@ from utils.transaction_ops import (
     update_transaction,
     delete_transaction,
     view_transactions_from_file,
-    filter_transactions_by_year
+    filter_transactions_by_year,
+    restore_transactions_backup,
+    import_export_transactions
 )
+from utils.transaction_table import TransactionTable
+from utils.background_save import BackgroundSaver
+from utils.storage import CSVStorage, open_storage
 
 
-# Global list to store the transactions in memory
-transactions = []
+# Data file; a .db/.sqlite name stores transactions in SQLite instead of CSV,
+# and a directory such as 'data/partitions/' keeps one CSV per year
+DATA_FILE = 'data/financial_transactions.csv'
+storage = open_storage(DATA_FILE)
+
+# Global columnar table to store the transactions in memory
+transactions = TransactionTable()
+# Runs option 7 saves on a background thread
+saver = BackgroundSaver()
 
 def show_menu():
     """
@@ -42,15 +56,26 @@ def show_menu():
         print("9. Monthly Summary (Income, Expenses, Balance)")
         print("10. Filter Transactions by Year")  # Moved up
         print("11. View Transactions from File")
-        print("12. Exit")  # Always last
+        print("12. Compact Data File (full rewrite)")
+        print("13. Restore Data File from Backup")
+        print("14. Import/Export (CSV <-> SQLite)")
+        print("15. Customer Summary (Top/Bottom Customers)")
+        print("16. Drill-Down Summary (Year > Quarter > Month > Day)")
+        print("17. Exit")  # Always last
         print("\n=============================================="
               "\n==============================================")
               
 
-        choice = input("\nPlease Enter your choice (1–12): ").strip()
+        # Report a background save that finished since the last prompt
+        saver.poll()
+
+        choice = input("\nPlease Enter your choice (1–17): ").strip()
 
         if choice == "1":
-            transactions = load_transactions()
+            saver.wait()
+            if transactions.journal is not None:
+                transactions.journal.close()
+            transactions = storage.load()
 
         elif choice == "2":
             add_transaction(transactions)
@@ -71,23 +96,59 @@ def show_menu():
             print("\n 📊 Financial analysis complete.")
 
         elif choice == "7":
-            save_transactions(transactions)
+            if isinstance(storage, CSVStorage):
+                saver.start(transactions, storage.filename)
+            else:
+                storage.save(transactions)
 
         elif choice == "8":
             generate_report(transactions)
 
         elif choice == "9":
-            calculate_monthly_summary(transactions)
+            if storage.can_query(transactions):
+                print_monthly_summary(storage.monthly_summary())
+            else:
+                calculate_monthly_summary(transactions)
 
         elif choice == "10":
-            filter_transactions_by_year(transactions)
+            filter_transactions_by_year(transactions, storage)
 
         elif choice == "11":
             view_transactions_from_file()
 
         elif choice == "12":
+            if not isinstance(storage, CSVStorage):
+                print("⚠️ Compaction only applies to CSV data files.")
+            elif saver.busy():
+                print("⏳ A save is already running in the background; try again when it finishes.")
+            else:
+                compact_transactions(transactions, storage.filename)
+
+        elif choice == "13":
+            saver.wait()
+            if not isinstance(storage, CSVStorage):
+                print("⚠️ Backups are only kept for CSV data files.")
+            elif restore_transactions_backup(storage.filename):
+                if transactions.journal is not None:
+                    transactions.journal.close()
+                transactions = storage.load()
+
+        elif choice == "14":
+            saver.wait()
+            import_export_transactions()
+
+        elif choice == "15":
+            analyze_customers(transactions)
+
+        elif choice == "16":
+            drill_down_summary(transactions)
+
+        elif choice == "17":
+            saver.wait()
+            if transactions.journal is not None:
+                transactions.journal.close()
             print("\n👋 Exiting the program. Goodbye!")
             break
 
         else:
-            print("\n ⚠️ Invalid choice. Please enter a number between 1 and 12.")
+            print("\n ⚠️ Invalid choice. Please enter a number between 1 and 17.")
@@ -0,0 +1,234 @@
+from datetime import datetime
+import os
+
+from utils.analysis import load_transactions, monthly_totals, save_transactions
+from utils import backups
+from utils.background_save import BackgroundSaver
+from utils.incremental import TailLoader
+from utils.partitioned import PartitionedStorage
+from utils.record_file import RecordFile, export_records, import_records
+from utils.storage import SQLiteStorage
+from utils.transaction_ops import add_transaction, update_transaction
+from utils.transaction_table import TransactionTable, parse_cents
+
+
+def make_transaction(transaction_id, day, amount=10.0, t_type='credit', description='Test.'):
+    return {
+        'transaction_id': transaction_id,
+        'date': datetime.strptime(day, '%Y-%m-%d'),
+        'customer_id': 1,
+        'amount': amount,
+        'type': t_type,
+        'description': description
+    }
+
+
+# -----------------------------------------------------
+# Monthly summary
+# -----------------------------------------------------
+def test_monthly_totals_leave_out_transfer_only_months():
+    rows = [
+        make_transaction(1, '2020-01-05', amount=100.0),
+        make_transaction(2, '2020-01-06', amount=-20.0, t_type='debit'),
+        make_transaction(3, '2020-02-01', amount=-9.99, t_type='transfer')
+    ]
+    expected = {'2020-01': {'credit': 10000, 'debit': 2000}}
+    assert monthly_totals(rows) == expected
+    assert monthly_totals(iter(rows)) == expected
+    assert monthly_totals(TransactionTable(rows)) == expected
+    assert monthly_totals([]) is None
+
+
+# -----------------------------------------------------
+# Background save
+# -----------------------------------------------------
+def test_background_save_appends_new_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    filename = 'transactions.csv'
+    save_transactions(TransactionTable([make_transaction(1, '2020-01-05')]), filename)
+    transactions = load_transactions(filename, use_snapshot=False)
+    transactions.append(make_transaction(2, '2020-01-06'))
+
+    saver = BackgroundSaver()
+    assert saver.start(transactions, filename)
+    saver.wait()
+
+    assert list(load_transactions(filename, use_snapshot=False).ids) == [1, 2]
+    assert transactions.can_append_to(filename)
+
+
+# -----------------------------------------------------
+# Journal
+# -----------------------------------------------------
+def test_journal_fsyncs_once_per_sync_every_records(tmp_path, monkeypatch):
+    filename = str(tmp_path / 'transactions.csv')
+    save_transactions(TransactionTable([make_transaction(1, '2020-01-05')]), filename)
+    for sync_every, records in ((1, 5), (3, 7), (4, 8)):
+        transactions = load_transactions(filename, use_snapshot=False, sync_every=sync_every)
+        syncs = []
+        monkeypatch.setattr(os, 'fsync', syncs.append)
+        for i in range(records):
+            transactions.append(make_transaction(100 + i, '2020-01-06'))
+        transactions.journal.close()
+        monkeypatch.undo()
+        assert len(syncs) == -(-records // sync_every)
+        os.remove(transactions.journal.path)
+
+
+# -----------------------------------------------------
+# Backups
+# -----------------------------------------------------
+def test_backups_of_same_named_files_are_kept_apart(tmp_path):
+    backup_dir = str(tmp_path / 'backup')
+    first, second = tmp_path / 'a' / 'data.csv', tmp_path / 'b' / 'data.csv'
+    for path, text in ((first, 'first\n'), (second, 'second\n')):
+        path.parent.mkdir()
+        path.write_text(text)
+        backups.backup_file(str(path), backup_dir)
+
+    assert len(backups.list_backups(str(first), backup_dir)) == 1
+    assert len(backups.list_backups(str(second), backup_dir)) == 1
+    backups.prune_backups(str(first), backup_dir, keep_last=0, keep_daily=0, keep_monthly=0)
+    assert backups.list_backups(str(first), backup_dir) == []
+
+    second.write_text('changed\n')
+    backups.restore_backup(filename=str(second), backup_dir=backup_dir)
+    assert second.read_text() == 'second\n'
+
+
+# -----------------------------------------------------
+# SQLite storage
+# -----------------------------------------------------
+def test_sqlite_monthly_summary_matches_memory(tmp_path):
+    transactions = TransactionTable([
+        make_transaction(1, '2020-01-05', amount=100.0),
+        make_transaction(2, '2020-01-06', amount=-45.5),
+        make_transaction(3, '2020-01-07', amount=-20.0, t_type='debit'),
+        make_transaction(4, '2020-01-08', amount=5.25, t_type='debit'),
+        make_transaction(5, '2020-02-01', amount=-9.99, t_type='transfer')
+    ])
+    storage = SQLiteStorage(str(tmp_path / 'transactions.db'))
+    storage.save(transactions)
+
+    assert storage.monthly_summary() == monthly_totals(transactions)
+    assert storage.monthly_summary()['2020-01'] == {'credit': 5450, 'debit': 2525}
+
+
+# -----------------------------------------------------
+# Partitioned storage
+# -----------------------------------------------------
+def test_partial_load_keeps_unloaded_rows_across_saves(tmp_path):
+    directory = str(tmp_path / 'partitions')
+    PartitionedStorage(directory).save(TransactionTable([
+        make_transaction(1, '2019-01-05'),
+        make_transaction(2, '2019-06-05'),
+        make_transaction(3, '2020-01-05'),
+        make_transaction(4, '2020-06-05')
+    ]))
+
+    storage = PartitionedStorage(directory)
+    transactions = storage.load(start_date='2020-01-01')
+    assert sorted(transactions.ids) == [3, 4]
+
+    transactions.append(make_transaction(5, '2019-07-01'))
+    storage.save(transactions)
+    transactions.append(make_transaction(6, '2019-08-01'))
+    storage.save(transactions)
+
+    everything = PartitionedStorage(directory).load()
+    assert sorted(everything.ids) == [1, 2, 3, 4, 5, 6]
+    assert storage.partitions()['2019']['rows'] == 4
+
+
+def test_partial_load_saved_through_another_storage_instance(tmp_path):
+    directory = str(tmp_path / 'partitions')
+    PartitionedStorage(directory).save(TransactionTable([
+        make_transaction(1, '2019-01-05'),
+        make_transaction(2, '2019-06-05'),
+        make_transaction(3, '2020-01-05')
+    ]))
+
+    loader = PartitionedStorage(directory)
+    transactions = loader.load(start_date='2020-01-01')
+    loader.load()
+    transactions.append(make_transaction(5, '2019-07-01'))
+    PartitionedStorage(directory).save(transactions)
+    loader.save(transactions)
+
+    assert sorted(PartitionedStorage(directory).load().ids) == [1, 2, 3, 5]
+
+
+# -----------------------------------------------------
+# Incremental loading
+# -----------------------------------------------------
+HEADER = "transaction_id,date,customer_id,amount,type,description\n"
+
+
+def test_tail_loader_reloads_after_same_length_rewrite(tmp_path):
+    # Large enough that the middle row is outside the hashed first and last 64 KiB
+    path = tmp_path / 'feed.csv'
+    rows = [f"{i},2020-01-05,1,10.00,credit,Row {i:05d}\n" for i in range(6000)]
+    path.write_text(HEADER + ''.join(rows))
+    loader = TailLoader(str(path))
+    assert loader.refresh().cents[3000] == 1000
+
+    # Saved through a temporary file and os.replace(), same length
+    rows[3000] = rows[3000].replace('10.00', '90.00')
+    with open(str(path) + '.tmp', 'w') as f:
+        f.write(HEADER + ''.join(rows))
+    os.replace(str(path) + '.tmp', path)
+    assert loader.refresh().cents[3000] == 9000
+
+    # Edited in place, same length
+    with open(path, 'r+b') as f:
+        f.seek(len(HEADER) + sum(map(len, rows[:3000])) + len("3000,2020-01-05,1,"))
+        f.write(b"80")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert loader.refresh().cents[3000] == 8000
+
+    with open(path, 'a') as f:
+        f.write("6000,2020-01-07,1,12.00,credit,New\n")
+    transactions = loader.refresh()
+    assert len(transactions) == 6001 and transactions.cents[3000] == 8000
+
+
+# -----------------------------------------------------
+# Binary record files
+# -----------------------------------------------------
+def test_record_file_round_trip_keeps_descriptions(tmp_path):
+    path = str(tmp_path / 'archive.rec')
+    transactions = TransactionTable([
+        make_transaction(1, '2019-01-05', description=''),
+        make_transaction(2, '2019-01-06', amount=-12.34, t_type='debit', description='abc'),
+        make_transaction(3, '2019-01-07', t_type='transfer', description=''),
+        make_transaction(4, '2019-01-08', description='abc')
+    ])
+    export_records(transactions, path)
+
+    imported = import_records(path)
+    assert [dict(t) for t in imported] == [dict(t) for t in transactions]
+    with RecordFile(path) as records:
+        assert [records[i]['description'] for i in range(len(records))] == ['', 'abc', '', 'abc']
+
+
+# -----------------------------------------------------
+# Adding and updating transactions
+# -----------------------------------------------------
+def test_typed_amounts_are_parsed_like_the_loader(monkeypatch):
+    transactions = TransactionTable([make_transaction(1, '2020-01-05')])
+    for text in ('1.015', '1e3', '0.29'):
+        answers = iter(['2020-01-06', '', text, 'd', 'Typed.'])
+        monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+        add_transaction(transactions)
+        assert transactions.cents[-1] == -parse_cents(text)
+
+    answers = iter([str(transactions.ids[-1]), '', '', '0.545', '', ''])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    update_transaction(transactions)
+    assert transactions.cents[-1] == parse_cents('0.545') == 54
+
+    answers = iter(['2020-01-06', '', 'abc', 'c', 'Typed.'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    add_transaction(transactions)
+    assert len(transactions) == 4
@@ -0,0 +1,214 @@
+from collections.abc import Mapping
+from datetime import datetime
+
+from utils.grouping import group_by
+from utils.rollup import RollupCube
+from utils.transaction_table import TransactionTable, TRANSACTION_TYPES, TYPE_CODES, to_cents
+
+# group_by() aggregations that fill the (day, type) buckets
+BUCKET_AGGREGATIONS = {'count': 'count', 'cents': ('sum', 'amount'), 'absolute': ('sum', 'abs_amount')}
+# Check the maintained aggregates of a table against a full recompute
+# every time they are used (slow; for testing)
+VERIFY_AGGREGATES = False
+
+
+# -----------------------------------------------------
+# Totals shared by the summary, the report and the monthly summary
+# -----------------------------------------------------
+class Aggregates:
+    """
+    Everything the summaries need, from one pass over the transactions.
+
+    Rows are added into one bucket per (date ordinal, type code) holding
+    [row count, sum of amounts, sum of the negative amounts], in integer
+    cents. Totals and counts by type, the date range and the monthly totals
+    are then read from these day buckets (a few thousand at most) instead
+    of from the rows.
+
+    Attached to a TransactionTable (table.aggregates), the buckets are
+    adjusted on every append, update and deletion: each change removes the
+    row from its old bucket and/or adds it to its new one, in O(1).
+
+    rollup() rolls the day buckets up into a RollupCube (weeks, months,
+    quarters, years), kept in `cube` and patched by add() and remove();
+    adding whole columns drops it, to be rebuilt from the buckets.
+    """
+
+    def __init__(self):
+        self.days = {}
+        self.cube = None
+
+    def add(self, ordinal, type_code, cents):
+        """
+        Add one transaction to its day bucket.
+        """
+        bucket = self.days.get((ordinal, type_code))
+        if bucket is None:
+            bucket = self.days[(ordinal, type_code)] = [0, 0, 0]
+        bucket[0] += 1
+        bucket[1] += cents
+        if cents < 0:
+            bucket[2] += cents
+        if self.cube is not None:
+            self.cube.add(ordinal, type_code, cents)
+
+    def remove(self, ordinal, type_code, cents):
+        """
+        Take one transaction back out of its day bucket.
+        """
+        key = (ordinal, type_code)
+        bucket = self.days[key]
+        bucket[0] -= 1
+        bucket[1] -= cents
+        if cents < 0:
+            bucket[2] -= cents
+        if not bucket[0]:
+            # Drop empty days so first_date()/last_date() stay correct
+            del self.days[key]
+        if self.cube is not None:
+            self.cube.remove(ordinal, type_code, cents)
+
+    def add_columns(self, dates, types, cents_column):
+        """
+        Add every row of a table's date, type and cents columns.
+        """
+        columns = {'date': dates, 'type': types, 'amount': cents_column}
+        self.add_groups(group_by(columns, ('date', 'type'), BUCKET_AGGREGATIONS))
+
+    def add_groups(self, groups):
+        """
+        Add the result of group_by(..., ('date', 'type'), BUCKET_AGGREGATIONS).
+        """
+        days = self.days
+        self.cube = None
+        for (day, t_type), group in groups.items():
+            key = (day.toordinal(), TYPE_CODES[t_type])
+            bucket = days.get(key)
+            if bucket is None:
+                bucket = days[key] = [0, 0, 0]
+            bucket[0] += group['count']
+            bucket[1] += group['cents']
+            # total = positives - |negatives| and absolute = positives + |negatives|
+            bucket[2] += (group['cents'] - group['absolute']) // 2
+
+    def __eq__(self, other):
+        return isinstance(other, Aggregates) and self.days == other.days
+
+    def __len__(self):
+        return sum(bucket[0] for bucket in self.days.values())
+
+    def counts(self):
+        """
+        Return {'credit': rows, 'debit': rows, 'transfer': rows}.
+        """
+        counts = dict.fromkeys(TRANSACTION_TYPES, 0)
+        for (ordinal, type_code), bucket in self.days.items():
+            counts[TRANSACTION_TYPES[type_code]] += bucket[0]
+        return counts
+
+    def totals(self, absolute=False):
+        """
+        Return {'credit': cents, 'debit': cents, 'transfer': cents}; with
+        absolute=True every amount counts as positive.
+        """
+        totals = dict.fromkeys(TRANSACTION_TYPES, 0)
+        for (ordinal, type_code), (count, cents, negative) in self.days.items():
+            totals[TRANSACTION_TYPES[type_code]] += cents - 2 * negative if absolute else cents
+        return totals
+
+    def first_date(self):
+        """
+        Return the earliest transaction date as a datetime, or None.
+        """
+        return datetime.fromordinal(min(self.days)[0]) if self.days else None
+
+    def last_date(self):
+        """
+        Return the latest transaction date as a datetime, or None.
+        """
+        return datetime.fromordinal(max(self.days)[0]) if self.days else None
+
+    def rollup(self):
+        """
+        Return the RollupCube of the day buckets, building it on first use.
+        """
+        if self.cube is None:
+            self.cube = RollupCube.from_days(self.days)
+        return self.cube
+
+    def monthly(self):
+        """
+        Return {'YYYY-MM': {'credit': cents, 'debit': cents}} with debits
+        as positive amounts, or None if there are no transactions.
+        Months with only transfers are left out.
+        """
+        if not self.days:
+            return None
+        cube = self.rollup()
+        summary = {}
+        for month in cube.periods('month'):
+            totals = cube.totals('month', month)
+            if totals['credit']['count'] or totals['debit']['count']:
+                summary[month] = {'credit': totals['credit']['cents'], 'debit': totals['debit']['absolute']}
+        return summary
+
+
+# -----------------------------------------------------
+# AGGREGATE transactions in a single pass (maintained for tables)
+# -----------------------------------------------------
+def aggregate(transactions):
+    """
+    Return the Aggregates of any iterable of transactions, reading it once
+    row by row (in constant memory), or of a dictionary from
+    transaction_columns(). A TransactionTable keeps the result in
+    table.aggregates and adjusts it on every change, so later summaries
+    answer without reading the rows.
+    """
+    if isinstance(transactions, TransactionTable):
+        if transactions.aggregates is None:
+            transactions.aggregates = _aggregate_table(transactions)
+        elif VERIFY_AGGREGATES:
+            verify_aggregates(transactions)
+        return transactions.aggregates
+
+    result = Aggregates()
+    if isinstance(transactions, Mapping):
+        result.add_groups(group_by(transactions, ('date', 'type'), BUCKET_AGGREGATIONS))
+        return result
+    for t in transactions:
+        result.add(t['date'].toordinal(), TYPE_CODES[t['type']], to_cents(t['amount']))
+    return result
+
+
+def _aggregate_table(transactions):
+    result = Aggregates()
+    result.add_columns(transactions.dates, transactions.types, transactions.cents)
+    return result
+
+
+# -----------------------------------------------------
+# VERIFY maintained aggregates against a full recompute
+# -----------------------------------------------------
+def verify_aggregates(transactions):
+    """
+    Recompute a table's aggregates from its columns and compare them with
+    the maintained ones. On a mismatch the differing days are reported and
+    the recomputed aggregates replace the maintained ones.
+    Returns True if they matched (or none were maintained yet).
+    """
+    maintained = transactions.aggregates
+    if maintained is None:
+        return True
+    expected = _aggregate_table(transactions)
+    if maintained == expected:
+        return True
+
+    wrong = sorted(key for key in maintained.days.keys() | expected.days.keys()
+                   if maintained.days.get(key) != expected.days.get(key))
+    print(f"❌ Maintained aggregates differ from a full recompute on {len(wrong)} day/type buckets")
+    for ordinal, type_code in wrong[:5]:
+        print(f"   {datetime.fromordinal(ordinal).strftime('%Y-%m-%d')} {TRANSACTION_TYPES[type_code]}: "
+              f"maintained {maintained.days.get((ordinal, type_code))}, "
+              f"recomputed {expected.days.get((ordinal, type_code))}")
+    transactions.aggregates = expected
+    return False
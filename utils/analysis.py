@@ -2,7 +2,18 @@ from datetime import datetime
 import os
 import shutil
 import csv
-from collections import defaultdict
+from utils import backups, snapshot
+from utils.aggregates import Aggregates, aggregate
+from utils.customers import CustomerSummary, customer_summary
+from utils.journal import SYNC_EVERY, attach_journal, journal_path
+from utils.compression import codec_for, open_csv
+from utils.bulk_writer import HEADER_LINE, LINE_END, write_transactions
+from utils.rejects import RejectedRowSink
+from utils.rollup import DRILL_DOWN, level_of
+from utils.transaction_table import TransactionTable, TYPE_CODES, format_cents, parse_cents, to_cents
+
+# Customers listed at each end of the ranking in the report
+REPORT_TOP_CUSTOMERS = 5
 
 # -----------------------------------------------------
 # HELPER FUNCTION: Parse a single transaction row
@@ -16,7 +27,7 @@ def parse_transaction_row(row):
       - transaction_id: int
       - date: string in YYYY-MM-DD format
       - customer_id: int
-      - amount: float
+      - amount: dollars, parsed exactly as integer cents (see parse_cents())
       - type: 'credit', 'debit', or 'transfer'
       - description: string
     """
@@ -25,7 +36,7 @@ def parse_transaction_row(row):
             'transaction_id': int(row['transaction_id']),
             'date': datetime.strptime(row['date'], '%Y-%m-%d'),
             'customer_id': int(row['customer_id']),
-            'amount': float(row['amount']),
+            'amount': parse_cents(row['amount']),
             'type': row['type'].strip().lower(),
             'description': row['description'].strip()
         }
@@ -35,6 +46,7 @@ def parse_transaction_row(row):
 
         if transaction['type'] == 'debit':
             transaction['amount'] = -abs(transaction['amount'])
+        transaction['amount'] /= 100
 
         return transaction
 
@@ -42,44 +54,142 @@ def parse_transaction_row(row):
         raise ValueError(f"Row parsing error: {e}")
 
 # -----------------------------------------------------
-# Option 1. LOAD transactions from CSV file
+# STREAM transactions from CSV file one row at a time
 # -----------------------------------------------------
-def load_transactions(filename='data/financial_transactions.csv'):
+def iter_transactions(filename='data/financial_transactions.csv', rejects=None):
     """
-    Load transactions from a CSV file.
-    Returns a list of transaction dictionaries.
-    Skips rows with invalid data and logs errors.
+    Lazily yield parsed transaction dictionaries from a CSV file.
+    Only one row is held in memory at a time, so any file size can be
+    streamed straight into analyze_finances(), generate_report() or
+    calculate_monthly_summary().
+    Compressed files (.gz, .bz2, .xz) are decompressed on the fly.
+    Skips rows with invalid data and records them in a RejectedRowSink
+    (a default one logging to errors.txt is used when none is given).
+    Raises FileNotFoundError when the file does not exist.
     """
-    transactions = []
+    owns_sink = rejects is None
+    if owns_sink:
+        rejects = RejectedRowSink()
     try:
-        with open(filename, newline='', encoding='utf-8') as f:
+        with open_csv(filename) as f:
             reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames or []
+            rejects.set_header(fieldnames)
             for row in reader:
                 try:
                     transaction = parse_transaction_row(row)
-                    transactions.append(transaction)
                 except Exception as e:
-                    with open("errors.txt", "a") as err_file:
-                        err_file.write(f"Skipping row due to error: {e}\n")
+                    # Missing trailing fields come back as None from DictReader
+                    raw_row = [row[name] for name in fieldnames if row[name] is not None]
+                    raw_row += row.get(None, [])
+                    rejects.reject(reader.line_num, raw_row, e)
+                    continue
+                yield transaction
+    finally:
+        if owns_sink:
+            rejects.close()
+
+# -----------------------------------------------------
+# Option 1. LOAD transactions from CSV file
+# -----------------------------------------------------
+def load_transactions(filename='data/financial_transactions.csv', rejects=None, use_snapshot=True,
+                      journal=True, sync_every=SYNC_EVERY):
+    """
+    Load transactions from a CSV file.
+    Returns a TransactionTable whose rows read like transaction dictionaries.
+    Skips rows with invalid data and logs them through a RejectedRowSink;
+    pass your own sink to add a quarantine CSV or inspect the counts.
+
+    With use_snapshot=True a binary sidecar snapshot (<filename>.snapshot)
+    is written after parsing and reused on later loads while the CSV is
+    unchanged, so no text is parsed (and no rows are re-rejected) then.
+
+    With journal=True, edits left in <filename>.journal by a session that
+    ended without saving are replayed on top of the file, and the returned
+    table records its own edits there until the next save. The journal is
+    fsync'ed every `sync_every` edits (see TransactionJournal).
+    """
+    owns_sink = rejects is None
+    if owns_sink:
+        rejects = RejectedRowSink()
+    try:
+        if use_snapshot:
+            cached = snapshot.load_snapshot(filename)
+            if cached is not None:
+                cached.mark_clean(filename)
+                print(f"✅ {len(cached)} transactions successfully loaded from {filename} (snapshot)")
+                if journal:
+                    _replay_journal(cached, filename, sync_every)
+                return cached
+            key = snapshot.file_key(filename)
+
+        transactions = TransactionTable(iter_transactions(filename, rejects))
+        transactions.mark_clean(filename)
 
         print(f"✅ {len(transactions)} transactions successfully loaded from {filename}")
+        if rejects.total:
+            print(f"⚠️ Skipped {rejects.total} invalid rows (details in {rejects.log_path})")
+        if use_snapshot:
+            stat = os.stat(filename)
+            if (stat.st_size, stat.st_mtime_ns) == key[:2]:
+                snapshot.save_snapshot(filename, transactions, key)
+        if journal:
+            _replay_journal(transactions, filename, sync_every)
         return transactions
 
     except FileNotFoundError:
         print(f"❌ File not found: {filename}")
-        return []
+        return TransactionTable()
 
     except Exception as e:
         print(f"❌ Error loading transactions: {e}")
-        return []
+        return TransactionTable()
+
+    finally:
+        if owns_sink:
+            rejects.close()
 
 # -----------------------------------------------------
-# Option 7. SAVE transactions to CSV and BACKUP original if not yet saved
+# HELPER FUNCTION: Replay unsaved edits from the journal
 # -----------------------------------------------------
-def save_transactions(transactions, filename='data/financial_transactions.csv'):
+def _replay_journal(transactions, filename, sync_every=SYNC_EVERY):
     """
-    Save a list of transactions to a CSV file.
-    If a backup of the original file doesn't exist, create it first in the backup folder.
+    Apply any journaled edits to a freshly loaded table and start
+    journaling its new edits, fsync'ed every `sync_every` edits.
+    """
+    applied = attach_journal(transactions, filename, sync_every)
+    if applied:
+        print(f"♻️ Replayed {applied} unsaved edits from {journal_path(filename)}")
+
+# -----------------------------------------------------
+# HELPER FUNCTION: Check whether new rows can be appended to a CSV
+# -----------------------------------------------------
+def _append_layout(filename):
+    """
+    Inspect an existing CSV before appending rows to it.
+    Returns (compatible, needs_header, needs_newline):
+      - compatible: the file is empty or has the standard header
+      - needs_header: the file is empty
+      - needs_newline: the last line has no line terminator
+    """
+    with open(filename, 'rb') as f:
+        first_line = f.readline()
+        if not first_line:
+            return True, True, False
+        f.seek(-1, os.SEEK_END)
+        needs_newline = f.read(1) not in (b'\n', b'\r')
+    compatible = first_line.rstrip(b'\r\n') == HEADER_LINE.rstrip(LINE_END).encode('utf-8')
+    return compatible, False, needs_newline
+
+# -----------------------------------------------------
+# HELPER FUNCTION: Back up the CSV before it is overwritten
+# -----------------------------------------------------
+def backup_current(filename):
+    """
+    If a backup of the original file doesn't exist, create it in the backup folder.
+    Then record the file's current contents as a versioned backup (skipped
+    if unchanged since the last one) and prune versions outside the
+    retention policy (see utils.backups).
     """
     backup_path = 'data/backup/financial_transactions_original.csv'
 
@@ -92,48 +202,137 @@ def save_transactions(transactions, filename='data/financial_transactions.csv'):
         else:
             print("⚠️ Warning: No original file found to backup.")
 
-    # Write current transactions to CSV
     try:
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=['transaction_id', 'date', 'customer_id', 'amount', 'type', 'description'])
-            writer.writeheader()
-            for t in transactions:
-                writer.writerow({
-                    'transaction_id': t['transaction_id'],
-                    'date': t['date'].strftime('%Y-%m-%d'),
-                    'customer_id': t['customer_id'],
-                    'amount': t['amount'],
-                    'type': t['type'],
-                    'description': t['description']
-                })
-        print(f"💾 Transactions saved to {filename}")
+        if backups.backup_file(filename):
+            backups.prune_backups(filename)
+    except OSError as e:
+        print(f"⚠️ Could not back up {filename}: {e}")
+
+# -----------------------------------------------------
+# HELPER FUNCTION: Decide between appending and a full rewrite
+# -----------------------------------------------------
+def can_append(transactions, filename, full_rewrite=False):
+    """
+    Return (appendable, needs_header, needs_newline) for saving
+    `transactions` to `filename`: appendable is True when only the table's
+    new rows need to be written (see save_transactions()). Compressed
+    files are always rewritten.
+    """
+    if full_rewrite or not isinstance(transactions, TransactionTable) or codec_for(filename):
+        return False, False, False
+    if not transactions.can_append_to(filename):
+        return False, False, False
+    compatible, needs_header, needs_newline = _append_layout(filename)
+    return compatible, needs_header, needs_newline
+
+# -----------------------------------------------------
+# HELPER FUNCTION: Rewrite the whole CSV atomically
+# -----------------------------------------------------
+def replace_csv(transactions, filename):
+    """
+    Write all transactions to a temporary CSV, then swap it in with
+    os.replace(), so the file is always either the old or the new version.
+    A .gz, .bz2 or .xz file name compresses the output as it is written.
+    Returns the number of rows written.
+    """
+    tmp_filename = filename + '.tmp'
+    with open_csv(tmp_filename, 'w', codec=codec_for(filename)) as f:
+        count = write_transactions(f, transactions)
+    os.replace(tmp_filename, filename)
+    return count
+
+# -----------------------------------------------------
+# Option 7. SAVE transactions to CSV and BACKUP the previous version
+# -----------------------------------------------------
+def save_transactions(transactions, filename='data/financial_transactions.csv', full_rewrite=False):
+    """
+    Save a list of transactions to a CSV file.
+    The file's previous contents are backed up first (see backup_current()).
+
+    A TransactionTable loaded from (or last saved to) this same, unchanged
+    file whose existing rows were not modified or deleted is saved by
+    appending only its new rows. The whole file is rewritten when existing
+    rows changed, when saving to another file, or with full_rewrite=True.
+    Saving to the file a table's journal belongs to is a checkpoint: the
+    journal is cleared once the CSV holds every edit.
+    """
+    backup_current(filename)
+
+    tracked = isinstance(transactions, TransactionTable)
+    try:
+        appendable, needs_header, needs_newline = can_append(transactions, filename, full_rewrite)
+
+        if appendable:
+            # Only new rows since the last load/save: append them
+            if not transactions.appended_rows:
+                print(f"💾 No changes to save to {filename}")
+                checkpoint_journal(transactions, filename)
+                return
+            with open(filename, 'a', newline='', encoding='utf-8') as f:
+                if needs_newline:
+                    f.write(LINE_END)
+                count = write_transactions(f, transactions, start=transactions.persisted_rows,
+                                           header=needs_header)
+            print(f"💾 {count} new transactions appended to {filename}")
+        else:
+            replace_csv(transactions, filename)
+            print(f"💾 Transactions saved to {filename}")
+
+        if tracked:
+            transactions.mark_clean(filename)
+            checkpoint_journal(transactions, filename)
 
     except Exception as e:
         print(f"❌ Error saving transactions: {e}")
 
+# -----------------------------------------------------
+# HELPER FUNCTION: Clear the journal once its edits are saved
+# -----------------------------------------------------
+def checkpoint_journal(transactions, filename, upto=None):
+    """
+    Drop the journaled edits that are now in `filename`: all of them, or
+    only the first `upto` records when later edits were not saved yet.
+    Does nothing if the table's journal belongs to another file.
+    """
+    journal = transactions.journal
+    if journal is not None and os.path.abspath(journal.filename) == os.path.abspath(filename):
+        journal.checkpoint(transactions.source[1:], upto)
+
+# -----------------------------------------------------
+# Option 12. COMPACT the CSV file with a full rewrite
+# -----------------------------------------------------
+def compact_transactions(transactions, filename='data/financial_transactions.csv'):
+    """
+    Rewrite the whole CSV from the in-memory transactions, even if only new
+    rows were added. This drops rows that failed to load, normalizes the
+    formatting of appended rows and compacts the description pool.
+    """
+    if isinstance(transactions, TransactionTable):
+        transactions.compact_pool()
+    save_transactions(transactions, filename, full_rewrite=True)
+
 # -----------------------------------------------------
 # Option 6. ANALYZE: Financial Summary
 # -----------------------------------------------------
 def analyze_finances(transactions):
     """
     Calculates and displays total credits, debits, transfers, and net balance.
+    Accepts any iterable of transactions and reads it in a single pass
+    (or not at all, since a table keeps its aggregates up to date; see aggregate()).
+    Totals are exact: they are added up in integer cents.
     """
     print("\n--- Financial Summary ---\n")
-    totals = defaultdict(float)
-
-    for t in transactions:
-        t_type = t['type']
-        totals[t_type] += t['amount']
+    totals = aggregate(transactions).totals()
 
     total_credit = totals['credit']
     total_debit = abs(totals['debit'])  # Show as positive
     total_transfer = totals['transfer']
     net_balance = total_credit - total_debit
 
-    print(f"Total Credits   : ${total_credit:,.2f}")
-    print(f"Total Debits    : ${total_debit:,.2f}")
-    print(f"Total Transfers : ${total_transfer:,.2f}")
-    print(f"Net Balance     : ${net_balance:,.2f}")
+    print(f"Total Credits   : ${format_cents(total_credit, grouping=True)}")
+    print(f"Total Debits    : ${format_cents(total_debit, grouping=True)}")
+    print(f"Total Transfers : ${format_cents(total_transfer, grouping=True)}")
+    print(f"Net Balance     : ${format_cents(net_balance, grouping=True)}")
 
 
 # -----------------------------------------------------
@@ -142,20 +341,31 @@ def analyze_finances(transactions):
 def generate_report(transactions, output_dir='reports'):
     """
     Generate a financial summary report and save it as a text file with a timestamp.
-    The report includes totals by type and net balance.
+    The report includes totals by type, net balance and the customers with
+    the highest and lowest net balance.
+    Accepts any iterable of transactions and reads it in a single pass.
     """
-    if not transactions:
+    if isinstance(transactions, TransactionTable):
+        aggregates = aggregate(transactions)
+        customers = customer_summary(transactions)
+    else:
+        # Feed both summaries from the same pass over the stream
+        aggregates, customers = Aggregates(), CustomerSummary()
+        for t in transactions:
+            ordinal, type_code, cents = t['date'].toordinal(), TYPE_CODES[t['type']], to_cents(t['amount'])
+            aggregates.add(ordinal, type_code, cents)
+            customers.add(t['customer_id'], ordinal, type_code, cents)
+    totals = aggregates.totals(absolute=True)
+    first_date = aggregates.first_date()
+    last_date = aggregates.last_date()
+
+    if first_date is None:
         print("⚠️ No transactions to generate a report.")
         return
 
-    totals = {'credit': 0, 'debit': 0, 'transfer': 0}
-    for t in transactions:
-        totals[t['type']] += abs(t['amount'])
     net_balance = totals['credit'] - totals['debit']
-
-    dates = [t['date'] for t in transactions]
-    start_date = min(dates).strftime('%Y-%m-%d')
-    end_date = max(dates).strftime('%Y-%m-%d')
+    start_date = first_date.strftime('%Y-%m-%d')
+    end_date = last_date.strftime('%Y-%m-%d')
 
     os.makedirs(output_dir, exist_ok=True)
     today_str = datetime.today().strftime('%Y%m%d')
@@ -166,41 +376,149 @@ def generate_report(transactions, output_dir='reports'):
             f.write("Smart Personal Finance Analyzer Report\n")
             f.write(f"Generated on: {datetime.today().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"Date Range: {start_date} to {end_date}\n\n")
-            f.write(f"Total Credits   : ${totals['credit']:.2f}\n")
-            f.write(f"Total Debits    : ${totals['debit']:.2f}\n")
-            f.write(f"Total Transfers : ${totals['transfer']:.2f}\n")
-            f.write(f"Net Balance     : ${net_balance:.2f}\n")
+            f.write(f"Total Credits   : ${format_cents(totals['credit'])}\n")
+            f.write(f"Total Debits    : ${format_cents(totals['debit'])}\n")
+            f.write(f"Total Transfers : ${format_cents(totals['transfer'])}\n")
+            f.write(f"Net Balance     : ${format_cents(net_balance)}\n")
             f.write("\nBy Type:\n")
-            for ttype, amount in totals.items():
-                f.write(f"  {ttype.capitalize():<10}: ${amount:.2f}\n")
+            for ttype, cents in totals.items():
+                f.write(f"  {ttype.capitalize():<10}: ${format_cents(cents)}\n")
+            f.write(f"\nCustomers: {len(customers)}\n")
+            f.write(f"\nTop {REPORT_TOP_CUSTOMERS} Customers by Net Balance:\n")
+            for row in customers.top(REPORT_TOP_CUSTOMERS):
+                f.write(format_customer(row) + "\n")
+            f.write(f"\nBottom {REPORT_TOP_CUSTOMERS} Customers by Net Balance:\n")
+            for row in customers.bottom(REPORT_TOP_CUSTOMERS):
+                f.write(format_customer(row) + "\n")
 
         print(f"📄 Report successfully saved to {filename}")
     except Exception as e:
         print(f"❌ Error saving report: {e}")
 
+# -----------------------------------------------------
+# Option 15. ANALYZE: Customer Summary
+# -----------------------------------------------------
+def format_customer(row):
+    """
+    Format one row of CustomerSummary.top()/bottom() as a line of text.
+    """
+    return (f"  Customer {row['customer_id']:>8} | Credits ${format_cents(row['credits'], grouping=True):>14}"
+            f" | Debits ${format_cents(row['debits'], grouping=True):>14}"
+            f" | Net ${format_cents(row['net'], grouping=True):>14} | {row['count']:>6} txns"
+            f" | {row['first_date'].strftime('%Y-%m-%d')} to {row['last_date'].strftime('%Y-%m-%d')}")
+
+
+def analyze_customers(transactions, top_n=10):
+    """
+    Display the customers with the highest and lowest net balance (credits
+    minus debits) and the most active customers.
+    Accepts any iterable of transactions and reads it in a single pass
+    (a table's summary is cached until the table changes).
+    """
+    summary = customer_summary(transactions)
+    if not len(summary):
+        print("⚠️ No transactions available to summarize.")
+        return
+
+    print(f"\n--- Customer Summary ({len(summary):,} customers) ---")
+    rankings = (
+        (f"Top {top_n} by Net Balance", summary.top(top_n)),
+        (f"Bottom {top_n} by Net Balance", summary.bottom(top_n)),
+        (f"Top {top_n} by Number of Transactions", summary.top(top_n, by='count'))
+    )
+    for title, rows in rankings:
+        print(f"\n{title}:")
+        for row in rows:
+            print(format_customer(row))
+
+
 # -----------------------------------------------------
 # MONTHLY SUMMARY: Step 8 & 9
 # -----------------------------------------------------
-def calculate_monthly_summary(transactions):
+def monthly_totals(transactions):
     """
-    Calculates and prints total income (credits), expenses (debits),
-    and net balance per month.
+    Total income (credits) and expenses (debits, as positive amounts) per
+    month, in integer cents. Returns {'YYYY-MM': {'credit': cents,
+    'debit': cents}}, or None if there are no transactions at all.
+    Accepts any iterable of transactions and reads it in a single pass
+    (or not at all, since a table keeps its aggregates up to date; see aggregate()).
+    """
+    return aggregate(transactions).monthly()
+
+
+def print_monthly_summary(summary):
     """
-    if not transactions:
+    Print the result of monthly_totals() (or SQLiteStorage.monthly_summary()).
+    """
+    if summary is None:
         print("⚠️ No transactions available to summarize.")
         return
 
     print("\n--- Monthly Summary ---")
-    summary = defaultdict(lambda: {'credit': 0.0, 'debit': 0.0})
-    for t in transactions:
-        month_key = t['date'].strftime('%Y-%m')
-        if t['type'] == 'credit':
-            summary[month_key]['credit'] += t['amount']
-        elif t['type'] == 'debit':
-            summary[month_key]['debit'] += abs(t['amount'])
-
     for month in sorted(summary.keys()):
         credit = summary[month]['credit']
         debit = summary[month]['debit']
         net = credit - debit
-        print(f"{month} => Income: ${credit:.2f}, Expenses: ${debit:.2f}, Net: ${net:.2f}")
+        print(f"{month} => Income: ${format_cents(credit)}, Expenses: ${format_cents(debit)}, "
+              f"Net: ${format_cents(net)}")
+
+
+def calculate_monthly_summary(transactions):
+    """
+    Calculates and prints total income (credits), expenses (debits),
+    and net balance per month.
+    Accepts any iterable of transactions and reads it in a single pass.
+    """
+    print_monthly_summary(monthly_totals(transactions))
+
+
+# -----------------------------------------------------
+# DRILL-DOWN: Year -> Quarter -> Month -> Day
+# -----------------------------------------------------
+def format_period(period, totals):
+    """
+    Format one period of RollupCube.totals() as a line of income, expenses and net.
+    """
+    credit = totals['credit']['cents']
+    debit = totals['debit']['absolute']
+    count = sum(t['count'] for t in totals.values())
+    return (f"{period:<10} => Income: ${format_cents(credit, grouping=True):>14}, "
+            f"Expenses: ${format_cents(debit, grouping=True):>14}, "
+            f"Net: ${format_cents(credit - debit, grouping=True):>14} | {count:>8} txns")
+
+
+def drill_down_summary(transactions):
+    """
+    Show income, expenses and net per year, then drill into any year,
+    quarter, month or ISO week to see its quarters, months or days.
+    Every answer comes from the rollup cube (see RollupCube), so drilling
+    never reads the rows; a table keeps the cube up to date as it changes.
+    """
+    cube = aggregate(transactions).rollup()
+    years = cube.periods('year')
+    if not years:
+        print("⚠️ No transactions available to summarize.")
+        return
+
+    print("\n--- Yearly Summary ---")
+    for year in years:
+        print(format_period(year, cube.totals('year', year)))
+
+    while True:
+        period = input("\nPeriod to drill into (e.g. 2024, 2024-Q1, 2024-03 or 2024-W10) "
+                       "[Press Enter to go back]: ").strip().upper()
+        if not period:
+            break
+        level = level_of(period)
+        if level is None or level == 'day':
+            print("⚠️ Enter a year, quarter, month or week, e.g. 2024, 2024-Q1, 2024-03 or 2024-W10.")
+            continue
+        rows = cube.drill(level, period)
+        if rows is None:
+            print(f"⚠️ No transactions in {period}.")
+            continue
+
+        print(f"\n--- {period} by {DRILL_DOWN[level]} ---")
+        for child, totals in rows:
+            print(format_period(child, totals))
+        print(format_period('Total', cube.totals(level, period)))
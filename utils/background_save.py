@@ -0,0 +1,132 @@
+import os
+import threading
+
+from utils.analysis import backup_current, can_append, checkpoint_journal, replace_csv
+from utils.bulk_writer import LINE_END, write_transactions
+from utils.transaction_table import TransactionTable
+
+
+# -----------------------------------------------------
+# SAVE transactions on a background thread
+# -----------------------------------------------------
+class BackgroundSaver:
+    """
+    Save transactions without blocking the interactive menu.
+
+    start() takes a copy of the table (one memcpy per column, see
+    TransactionTable.copy()) and rewrites the CSV from that copy on a
+    worker thread, through a temporary file and os.replace(), so the file
+    on disk is always either the old or the complete new version. The old
+    version is backed up first (see backup_current()), also on the worker
+    thread. Edits made meanwhile are not part of the save and stay unsaved
+    (and journaled) afterwards.
+
+    Only one save runs at a time: start() refuses while one is in flight.
+    A save that only needs to append new rows (see save_transactions())
+    also runs on the worker thread, backup first, and appends just the
+    rows added since the last load or save.
+
+    Call poll() before each prompt to report a finished save; it also
+    records the saved file on the table and checkpoints its journal.
+    """
+
+    def __init__(self):
+        self.thread = None
+        self.result = None
+        self._job = None
+
+    def busy(self):
+        return self.thread is not None
+
+    def start(self, transactions, filename='data/financial_transactions.csv', full_rewrite=False):
+        """
+        Begin saving `transactions` to `filename`.
+        Returns True if the save was started (or done), False if another
+        save is still running.
+        """
+        if self.busy():
+            print("⏳ A save is already running in the background; try again when it finishes.")
+            return False
+
+        try:
+            appendable, needs_header, needs_newline = can_append(transactions, filename, full_rewrite)
+        except OSError:
+            appendable = False
+        if appendable and not transactions.appended_rows:
+            print(f"💾 No changes to save to {filename}")
+            checkpoint_journal(transactions, filename)
+            return True
+
+        tracked = isinstance(transactions, TransactionTable)
+        if tracked:
+            # With appendable, only rows from `start` on are written
+            append = (transactions.persisted_rows, needs_header, needs_newline) if appendable else None
+            snapshot = transactions.copy()
+            journal = transactions.journal
+            upto = journal.records if journal is not None else None
+            transactions.mark_saving()
+        else:
+            append = None
+            snapshot = [dict(t) for t in transactions]
+            upto = None
+
+        self._job = (transactions, filename, upto)
+        self.result = None
+        self.thread = threading.Thread(target=self._run, args=(snapshot, filename, append), daemon=True)
+        self.thread.start()
+        if append is not None:
+            print(f"💾 Appending {len(snapshot) - append[0]} new transactions to {filename} in the background...")
+        else:
+            print(f"💾 Saving {len(snapshot)} transactions to {filename} in the background...")
+        return True
+
+    def _run(self, snapshot, filename, append=None):
+        try:
+            # Reading, hashing and compressing the old file takes seconds
+            # on large files, so the backup is done here and not in start()
+            backup_current(filename)
+            if append is None:
+                count = replace_csv(snapshot, filename)
+            else:
+                start, needs_header, needs_newline = append
+                with open(filename, 'a', newline='', encoding='utf-8') as f:
+                    if needs_newline:
+                        f.write(LINE_END)
+                    count = write_transactions(f, snapshot, start=start, header=needs_header)
+            stat = os.stat(filename)
+            self.result = (True, count, (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns))
+        except Exception as e:
+            self.result = (False, e, None)
+
+    def poll(self):
+        """
+        Report the background save if it has finished.
+        Returns True if a result was reported.
+        """
+        if self.thread is None or self.thread.is_alive():
+            return False
+        self.thread.join()
+        self.thread = None
+        transactions, filename, upto = self._job
+        self._job = None
+        ok, detail, source = self.result
+
+        if not ok:
+            # Source stays unknown, so the next save is a full rewrite
+            print(f"❌ Background save to {filename} failed: {detail}")
+            return True
+
+        print(f"💾 Background save finished: {detail} transactions saved to {filename}")
+        if isinstance(transactions, TransactionTable):
+            transactions.source = source
+            checkpoint_journal(transactions, filename, upto)
+        return True
+
+    def wait(self):
+        """
+        Block until the running save (if any) finishes, then report it.
+        """
+        if self.thread is not None:
+            print("⏳ Waiting for the background save to finish...")
+            self.thread.join()
+        self.poll()
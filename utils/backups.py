@@ -0,0 +1,260 @@
+from datetime import datetime
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import zlib
+
+BACKUP_DIR = 'data/backup'
+# Compressed object formats: (file extension, module, options for writing)
+COMPRESSORS = {
+    'gzip': ('.gz', gzip, {'compresslevel': 6}),
+    'lzma': ('.xz', lzma, {'preset': 6})
+}
+
+# Chunk boundaries fall after a line whose CRC32 has its low bits all zero,
+# once a chunk holds at least MIN_CHUNK bytes (MAX_CHUNK forces a cut).
+# Because boundaries depend on content rather than offsets, an edit or an
+# appended row only changes the chunks around it.
+MIN_CHUNK = 64 * 1024
+MAX_CHUNK = 1024 * 1024
+BOUNDARY_MASK = (1 << 11) - 1
+
+# Default retention policy
+KEEP_LAST = 5
+KEEP_DAILY = 7
+KEEP_MONTHLY = 12
+
+
+# -----------------------------------------------------
+# HELPER FUNCTIONS: Store layout
+# -----------------------------------------------------
+def _versions_dir(backup_dir, filename):
+    # Keyed by the absolute path, so files with the same name in different
+    # directories keep separate versions: 'financial_transactions.csv-1a2b...'
+    path_digest = hashlib.sha256(os.path.abspath(filename).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(backup_dir, 'versions', f"{os.path.basename(filename)}-{path_digest}")
+
+
+def _read_manifests(directory):
+    if not os.path.isdir(directory):
+        return []
+    manifests = []
+    for name in os.listdir(directory):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                manifests.append(json.load(f))
+    return manifests
+
+
+def _object_path(backup_dir, digest, extension):
+    return os.path.join(backup_dir, 'objects', digest[:2], digest + extension)
+
+
+def _find_object(backup_dir, digest):
+    for extension, _, _ in COMPRESSORS.values():
+        path = _object_path(backup_dir, digest, extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _open_object(path):
+    for extension, module, _ in COMPRESSORS.values():
+        if path.endswith(extension):
+            return module.open(path, 'rb')
+    raise ValueError(f"Unknown backup object type: {path}")
+
+
+def iter_chunks(f):
+    """
+    Split an open binary file into content-defined chunks of whole lines.
+    """
+    chunk = []
+    size = 0
+    for line in f:
+        chunk.append(line)
+        size += len(line)
+        if size >= MAX_CHUNK or (size >= MIN_CHUNK and not zlib.crc32(line) & BOUNDARY_MASK):
+            yield b''.join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield b''.join(chunk)
+
+
+# -----------------------------------------------------
+# LIST backup versions of a file
+# -----------------------------------------------------
+def list_backups(filename='data/financial_transactions.csv', backup_dir=BACKUP_DIR):
+    """
+    Return the backup manifests of `filename`, newest first. Each is a
+    dictionary with the version id, creation time, size, SHA-256 of the
+    whole file and the list of chunk digests.
+    """
+    manifests = _read_manifests(_versions_dir(backup_dir, filename))
+    return sorted(manifests, key=lambda m: m['id'], reverse=True)
+
+
+# -----------------------------------------------------
+# BACKUP the current contents of a file
+# -----------------------------------------------------
+def backup_file(filename='data/financial_transactions.csv', backup_dir=BACKUP_DIR,
+                compression='gzip'):
+    """
+    Record the current contents of `filename` as a new backup version.
+
+    The file is split into content-defined chunks; each chunk is stored
+    once, compressed (gzip or lzma) under its SHA-256, so a version only
+    adds the chunks that changed since earlier versions. Nothing is stored
+    if the contents match the newest version.
+    Returns the new version id, or None if the backup was skipped.
+    """
+    if not os.path.exists(filename):
+        return None
+    extension, module, options = COMPRESSORS[compression]
+
+    whole = hashlib.sha256()
+    digests = []
+    new_bytes = 0
+    with open(filename, 'rb') as f:
+        for chunk in iter_chunks(f):
+            whole.update(chunk)
+            digest = hashlib.sha256(chunk).hexdigest()
+            digests.append(digest)
+            if _find_object(backup_dir, digest) is None:
+                path = _object_path(backup_dir, digest, extension)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with module.open(path + '.tmp', 'wb', **options) as out:
+                    out.write(chunk)
+                os.replace(path + '.tmp', path)
+                new_bytes += len(chunk)
+
+    backups = list_backups(filename, backup_dir)
+    if backups and backups[0]['sha256'] == whole.hexdigest():
+        return None
+
+    now = datetime.now()
+    manifest = {
+        'id': now.strftime('%Y%m%d-%H%M%S-%f'),
+        'created': now.isoformat(timespec='seconds'),
+        'size': os.path.getsize(filename),
+        'sha256': whole.hexdigest(),
+        'chunks': digests
+    }
+    directory = _versions_dir(backup_dir, filename)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, manifest['id'] + '.json')
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(path + '.tmp', path)
+    print(f"📦 Backup {manifest['id']} of {filename} saved "
+          f"({len(digests)} chunks, {new_bytes:,} new bytes)")
+    return manifest['id']
+
+
+# -----------------------------------------------------
+# PRUNE old backup versions
+# -----------------------------------------------------
+def prune_backups(filename='data/financial_transactions.csv', backup_dir=BACKUP_DIR,
+                  keep_last=KEEP_LAST, keep_daily=KEEP_DAILY, keep_monthly=KEEP_MONTHLY):
+    """
+    Delete backup versions outside the retention policy: the newest
+    `keep_last` versions are kept, plus the newest version of each of the
+    last `keep_daily` days and `keep_monthly` months that have backups.
+    Chunks no remaining version (of any file) refers to are deleted too.
+    Returns the number of versions deleted.
+    """
+    backups = list_backups(filename, backup_dir)
+    keep = set()
+    days = []
+    months = []
+    for position, manifest in enumerate(backups):
+        day = manifest['created'][:10]
+        month = manifest['created'][:7]
+        if position < keep_last:
+            keep.add(manifest['id'])
+        if day not in days and len(days) < keep_daily:
+            days.append(day)
+            keep.add(manifest['id'])
+        if month not in months and len(months) < keep_monthly:
+            months.append(month)
+            keep.add(manifest['id'])
+
+    directory = _versions_dir(backup_dir, filename)
+    removed = 0
+    for manifest in backups:
+        if manifest['id'] not in keep:
+            os.remove(os.path.join(directory, manifest['id'] + '.json'))
+            removed += 1
+    if removed:
+        _collect_garbage(backup_dir)
+    return removed
+
+
+def _collect_garbage(backup_dir):
+    """
+    Delete stored chunks that no version manifest refers to.
+    """
+    referenced = set()
+    versions_root = os.path.join(backup_dir, 'versions')
+    for source in os.listdir(versions_root):
+        for manifest in _read_manifests(os.path.join(versions_root, source)):
+            referenced.update(manifest['chunks'])
+
+    objects_root = os.path.join(backup_dir, 'objects')
+    for prefix in os.listdir(objects_root):
+        for name in os.listdir(os.path.join(objects_root, prefix)):
+            if name.split('.')[0] not in referenced:
+                os.remove(os.path.join(objects_root, prefix, name))
+
+
+# -----------------------------------------------------
+# RESTORE a backup version
+# -----------------------------------------------------
+def restore_backup(version_id=None, filename='data/financial_transactions.csv',
+                   backup_dir=BACKUP_DIR):
+    """
+    Rebuild `filename` from a backup version (the newest if version_id is
+    None) by concatenating its decompressed chunks; no CSV parsing is
+    involved. The result is checked against the version's SHA-256 and
+    swapped in with os.replace(), so a failed restore leaves the current
+    file untouched. The current contents are backed up first, so a
+    restore can itself be undone. Returns True on success.
+    """
+    backups = list_backups(filename, backup_dir)
+    if version_id is not None:
+        backups = [m for m in backups if m['id'] == version_id]
+    if not backups:
+        if version_id is None:
+            print(f"❌ No backups found for {filename}")
+        else:
+            print(f"❌ Backup {version_id} not found for {filename}")
+        return False
+    manifest = backups[0]
+
+    backup_file(filename, backup_dir)
+    tmp_filename = filename + '.restore'
+    try:
+        whole = hashlib.sha256()
+        with open(tmp_filename, 'wb') as out:
+            for digest in manifest['chunks']:
+                path = _find_object(backup_dir, digest)
+                if path is None:
+                    raise ValueError(f"missing chunk {digest}")
+                with _open_object(path) as f:
+                    chunk = f.read()
+                whole.update(chunk)
+                out.write(chunk)
+        if whole.hexdigest() != manifest['sha256']:
+            raise ValueError("restored contents do not match the backup checksum")
+        os.replace(tmp_filename, filename)
+        print(f"✅ Restored {filename} from backup {manifest['id']} ({manifest['created']})")
+        return True
+
+    except Exception as e:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        print(f"❌ Error restoring backup: {e}")
+        return False
@@ -0,0 +1,43 @@
+import bz2
+import gzip
+import lzma
+import os
+
+# Streaming codec for each compressed file extension
+CODECS = {
+    '.gz': gzip,
+    '.bz2': bz2,
+    '.xz': lzma
+}
+# Extra options when compressing; gzip's default level 9 costs about twice
+# the time of level 6 for a file only a few percent smaller
+WRITE_OPTIONS = {
+    gzip: {'compresslevel': 6}
+}
+
+
+def codec_for(filename):
+    """
+    Return the compression module (gzip, bz2 or lzma) for a file name, or
+    None for an uncompressed file.
+    """
+    return CODECS.get(os.path.splitext(filename)[1].lower())
+
+
+# -----------------------------------------------------
+# OPEN a CSV file, compressed or not
+# -----------------------------------------------------
+def open_csv(filename, mode='r', codec=None):
+    """
+    Open a CSV file as text for the csv module (UTF-8, newline='').
+    Files ending in .gz, .bz2 or .xz are decompressed while reading and
+    compressed while writing, as a stream, with no temporary files.
+    `codec` overrides the choice made from the extension, e.g. for a
+    temporary file that will be renamed to a .gz name.
+    """
+    if codec is None:
+        codec = codec_for(filename)
+    if codec is None:
+        return open(filename, mode, newline='', encoding='utf-8')
+    options = WRITE_OPTIONS.get(codec, {}) if mode in ('w', 'a') else {}
+    return codec.open(filename, mode + 't', newline='', encoding='utf-8', **options)
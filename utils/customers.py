@@ -0,0 +1,180 @@
+from array import array
+from collections.abc import Mapping
+from datetime import datetime
+import heapq
+import sys
+import weakref
+
+from utils.transaction_table import TransactionTable, TYPE_CODES, to_cents
+
+CREDIT = TYPE_CODES['credit']
+DEBIT = TYPE_CODES['debit']
+# What top() and bottom() can rank customers by
+METRICS = ('net', 'credits', 'debits', 'count')
+# CustomerSummary of each TransactionTable, with the table version it matches
+_cache = weakref.WeakKeyDictionary()
+
+
+# -----------------------------------------------------
+# Per-customer totals, one slot per customer
+# -----------------------------------------------------
+class CustomerSummary:
+    """
+    Credits, debits, net, transaction count and first/last activity date
+    of every customer, built by hash aggregation in a single pass.
+
+    `slots` maps each customer ID to its position in the columns:
+      - customer_ids:           array('q')
+      - credits, debits:        array('q') of cents (debits as positive amounts)
+      - counts:                 array('q') of transactions of any type
+      - first_dates, last_dates: array('i') of date ordinals
+
+    Memory depends only on the number of customers, never on the number of
+    rows: 48 bytes of columns plus one dict entry per customer (about
+    130 MB for 1M customers, whether they have 1M or 100M transactions).
+
+    top() and bottom() pick the best or worst N customers with a heap of
+    N entries (heapq.nlargest/nsmallest) instead of sorting all of them.
+    """
+
+    def __init__(self):
+        self.slots = {}
+        self.customer_ids = array('q')
+        self.credits = array('q')
+        self.debits = array('q')
+        self.counts = array('q')
+        self.first_dates = array('i')
+        self.last_dates = array('i')
+
+    def _new_slot(self, customer_id, ordinal):
+        slot = self.slots[customer_id] = len(self.customer_ids)
+        self.customer_ids.append(customer_id)
+        self.credits.append(0)
+        self.debits.append(0)
+        self.counts.append(0)
+        self.first_dates.append(ordinal)
+        self.last_dates.append(ordinal)
+        return slot
+
+    def add(self, customer_id, ordinal, type_code, cents):
+        """
+        Add one transaction to its customer's totals.
+        """
+        self.add_columns((customer_id,), (ordinal,), (type_code,), (cents,))
+
+    def add_columns(self, customers, dates, types, cents_column):
+        """
+        Add every row of a table's customer, date, type and cents columns.
+        One loop does everything; splitting the work into per-column passes
+        (Counter, itertools.compress) measured slower, because each pass
+        repeats the per-row slot lookups.
+        """
+        slots = self.slots
+        credits, debits, counts = self.credits, self.debits, self.counts
+        first_dates, last_dates = self.first_dates, self.last_dates
+        new_slot = self._new_slot
+        for customer_id, ordinal, type_code, cents in zip(customers, dates, types, cents_column):
+            slot = slots.get(customer_id)
+            if slot is None:
+                slot = new_slot(customer_id, ordinal)
+            counts[slot] += 1
+            if type_code == CREDIT:
+                credits[slot] += cents
+            elif type_code == DEBIT:
+                debits[slot] += abs(cents)
+            if ordinal < first_dates[slot]:
+                first_dates[slot] = ordinal
+            elif ordinal > last_dates[slot]:
+                last_dates[slot] = ordinal
+
+    def __len__(self):
+        return len(self.customer_ids)
+
+    def memory_usage(self):
+        """
+        Return the approximate number of bytes held by the columns and the
+        customer ID -> slot dictionary.
+        """
+        columns = (self.customer_ids, self.credits, self.debits, self.counts,
+                   self.first_dates, self.last_dates)
+        total = sum(col.buffer_info()[1] * col.itemsize for col in columns)
+        return (total + sys.getsizeof(self.slots) + sum(map(sys.getsizeof, self.slots))
+                + sum(map(sys.getsizeof, self.slots.values())))
+
+    def row(self, slot):
+        """
+        Return the totals in `slot` as a dictionary (amounts in cents).
+        """
+        return {
+            'customer_id': self.customer_ids[slot],
+            'credits': self.credits[slot],
+            'debits': self.debits[slot],
+            'net': self.credits[slot] - self.debits[slot],
+            'count': self.counts[slot],
+            'first_date': datetime.fromordinal(self.first_dates[slot]),
+            'last_date': datetime.fromordinal(self.last_dates[slot])
+        }
+
+    def get(self, customer_id):
+        """
+        Return one customer's totals as a dictionary, or None.
+        """
+        slot = self.slots.get(customer_id)
+        return None if slot is None else self.row(slot)
+
+    def _metric(self, by):
+        if by == 'net':
+            credits, debits = self.credits, self.debits
+            return lambda slot: credits[slot] - debits[slot]
+        if by == 'credits':
+            return self.credits.__getitem__
+        if by == 'debits':
+            return self.debits.__getitem__
+        if by == 'count':
+            return self.counts.__getitem__
+        raise ValueError(f"Unknown metric: {by} (expected one of {', '.join(METRICS)})")
+
+    def top(self, n=10, by='net'):
+        """
+        Return the `n` customers with the highest `by` value, best first.
+        """
+        slots = heapq.nlargest(n, range(len(self)), key=self._metric(by))
+        return [self.row(slot) for slot in slots]
+
+    def bottom(self, n=10, by='net'):
+        """
+        Return the `n` customers with the lowest `by` value, lowest first.
+        """
+        slots = heapq.nsmallest(n, range(len(self)), key=self._metric(by))
+        return [self.row(slot) for slot in slots]
+
+
+# -----------------------------------------------------
+# SUMMARIZE transactions per customer (cached for tables)
+# -----------------------------------------------------
+def customer_summary(transactions):
+    """
+    Return the CustomerSummary of any iterable of transactions, reading it
+    once row by row, or of a dictionary from transaction_columns().
+    For a TransactionTable the result is cached and reused until the
+    table's version changes.
+    """
+    if isinstance(transactions, TransactionTable):
+        cached = _cache.get(transactions)
+        if cached is not None and cached[0] == transactions.version:
+            return cached[1]
+        result = CustomerSummary()
+        result.add_columns(transactions.customers, transactions.dates, transactions.types,
+                           transactions.cents)
+        _cache[transactions] = (transactions.version, result)
+        return result
+
+    result = CustomerSummary()
+    if isinstance(transactions, Mapping):
+        result.add_columns(transactions['customer_id'], transactions['date'], transactions['type'],
+                           transactions['amount'])
+        return result
+    for t in transactions:
+        result.add(t['customer_id'], t['date'].toordinal(), TYPE_CODES[t['type']],
+                   to_cents(t['amount']))
+    return result
@@ -0,0 +1,270 @@
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Mapping
+from datetime import date, datetime
+import itertools
+import math
+import operator
+
+from utils.transaction_table import TransactionTable, TRANSACTION_TYPES, TYPE_CODES, to_cents
+
+
+def _quarter(ordinal):
+    day = date.fromordinal(ordinal)
+    return f"{day.year:04d}-Q{(day.month - 1) // 3 + 1}"
+
+
+def _month(ordinal):
+    day = date.fromordinal(ordinal)
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def _week(ordinal):
+    year, week, weekday = date.fromordinal(ordinal).isocalendar()
+    return f"{year:04d}-W{week:02d}"
+
+
+# Group keys derived from the date, computed once per distinct date ordinal
+DATE_KEYS = {
+    'date': datetime.fromordinal,                          # datetime of the day
+    'year': lambda ordinal: date.fromordinal(ordinal).year,  # 2019
+    'quarter': _quarter,                                   # '2019-Q1'
+    'month': _month,                                       # '2019-03'
+    'week': _week,                                         # '2019-W09' (ISO week)
+    'weekday': lambda ordinal: date.fromordinal(ordinal).isoweekday()  # 1 = Monday ... 7 = Sunday
+}
+KEYS = tuple(DATE_KEYS) + ('type', 'customer_id')
+AGGREGATIONS = ('sum', 'count', 'mean', 'min', 'max', 'distinct')
+# Fields the aggregations can read; amounts are integer cents
+FIELDS = ('amount', 'abs_amount', 'customer_id', 'transaction_id', 'date')
+# TransactionTable column holding each raw key or field
+TABLE_COLUMNS = {
+    'date': 'dates',
+    'type': 'types',
+    'customer_id': 'customers',
+    'amount': 'cents',
+    'transaction_id': 'ids'
+}
+
+
+# -----------------------------------------------------
+# Columns of a table or of any iterable of transactions
+# -----------------------------------------------------
+def transaction_columns(transactions, names=tuple(TABLE_COLUMNS)):
+    """
+    Return {name: column} for the given raw columns ('date' as ordinals,
+    'type' as codes, 'customer_id', 'amount' as cents, 'transaction_id').
+    A TransactionTable's own arrays are returned as they are; any other
+    iterable of transactions is read once into new arrays, so a stream
+    can be grouped several times without keeping its rows.
+    A dictionary of columns (e.g. an earlier result) is returned as is.
+    """
+    if isinstance(transactions, TransactionTable):
+        return {name: getattr(transactions, TABLE_COLUMNS[name]) for name in names}
+    if isinstance(transactions, Mapping):
+        return transactions
+
+    columns = {
+        'date': array('i'),
+        'type': array('b'),
+        'customer_id': array('q'),
+        'amount': array('q'),
+        'transaction_id': array('q')
+    }
+    for t in transactions:
+        columns['date'].append(t['date'].toordinal())
+        columns['type'].append(TYPE_CODES[t['type']])
+        columns['customer_id'].append(t['customer_id'])
+        columns['amount'].append(to_cents(t['amount']))
+        columns['transaction_id'].append(t['transaction_id'])
+    return {name: columns[name] for name in names}
+
+
+def _parse_aggregations(aggregations):
+    """
+    Turn {'name': 'count' or (function, field)} into [(name, function, field)].
+    """
+    specs = []
+    for name, spec in aggregations.items():
+        function, field = (spec, None) if isinstance(spec, str) else (spec[0], spec[1] if len(spec) > 1 else None)
+        if function not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation: {function} (expected one of {', '.join(AGGREGATIONS)})")
+        if function != 'count' and field not in FIELDS:
+            raise ValueError(f"Unknown field for {name}: {field} (expected one of {', '.join(FIELDS)})")
+        if field == 'date' and function in ('sum', 'mean'):
+            raise ValueError(f"Cannot {function} dates ({name})")
+        specs.append((name, function, field))
+    return specs
+
+
+# -----------------------------------------------------
+# GROUP BY: hash aggregation over the columns
+# -----------------------------------------------------
+def group_by(transactions, keys, aggregations):
+    """
+    Group transactions and aggregate each group, e.g.
+
+        group_by(transactions, ('month', 'type'),
+                 {'rows': 'count', 'total': ('sum', 'amount'),
+                  'customers': ('distinct', 'customer_id')})
+
+    returns {('2019-03', 'credit'): {'rows': 12, 'total': 123456,
+    'customers': 9}, ...}; with a single key the dictionary keys are the
+    plain values ('2019-03') instead of tuples.
+
+    Keys: date, year, quarter, month, week, weekday, type, customer_id.
+    Aggregations: 'count', or (function, field) with function one of sum,
+    mean, min, max, distinct (number of different values) and field one of
+    amount, abs_amount (amounts in cents), customer_id, transaction_id,
+    date (min/max give a datetime).
+
+    Accepts a TransactionTable, a dictionary from transaction_columns() or
+    any iterable of transactions, which is first copied into columns (so
+    its memory grows with the rows). Each row is hashed once, on
+    its raw column values (date ordinal, type code, customer ID), to number
+    its group. The date keys are computed once per distinct date, not per
+    row, and raw groups sharing a key are merged before aggregating; each
+    aggregation is then one tight pass that indexes lists by group number.
+    """
+    keys = (keys,) if isinstance(keys, str) else tuple(keys)
+    for key in keys:
+        if key not in KEYS:
+            raise ValueError(f"Unknown group key: {key} (expected one of {', '.join(KEYS)})")
+    specs = _parse_aggregations(aggregations)
+
+    raw_names = []
+    for key in keys:
+        raw = 'date' if key in DATE_KEYS else key
+        if raw not in raw_names:
+            raw_names.append(raw)
+    needed = set(raw_names) or {'type'}
+    for name, function, field in specs:
+        if field is not None:
+            needed.add('amount' if field == 'abs_amount' else field)
+    columns = transaction_columns(transactions, tuple(needed))
+
+    def raw_keys():
+        if not raw_names:
+            # No keys: every row falls into one group
+            return (() for _ in columns['type'])
+        if len(raw_names) == 1:
+            return iter(columns[raw_names[0]])
+        return zip(*(columns[name] for name in raw_names))
+
+    def values(field):
+        if field == 'abs_amount':
+            return map(abs, columns['amount'])
+        return iter(columns[field])
+
+    # Pass 1: number the raw groups 0, 1, 2, ... in order of appearance and
+    # give every row its group number (a C-level map, no Python per row)
+    if all(field is None for name, function, field in specs):
+        # Only counts: counting the raw keys is all there is to do
+        raw_counts = Counter(raw_keys())
+        raw_groups, row_groups = list(raw_counts), None
+    elif raw_names == ['type']:
+        # Type codes 0, 1, 2 already are group numbers
+        row_groups = columns['type']
+        raw_groups = list(range(len(TRANSACTION_TYPES)))
+    else:
+        numbers = defaultdict(itertools.count().__next__)
+        row_groups = array('i', map(numbers.__getitem__, raw_keys()))
+        raw_groups = list(numbers)
+
+    # Pass 2: compute the requested key of each raw group, so each date key
+    # is computed once per distinct date, not once per row
+    parts = []
+    for key in keys:
+        position = raw_names.index('date' if key in DATE_KEYS else key)
+        raw_values = raw_groups if len(raw_names) == 1 else [raw[position] for raw in raw_groups]
+        if key in DATE_KEYS or key == 'type':
+            function = DATE_KEYS[key] if key in DATE_KEYS else TRANSACTION_TYPES.__getitem__
+            cache = {value: function(value) for value in set(raw_values)}
+            raw_values = list(map(cache.__getitem__, raw_values))
+        parts.append(raw_values)
+    if len(keys) == 1:
+        final_of = parts[0]
+    elif keys:
+        final_of = list(zip(*parts))
+    else:
+        final_of = [()] * len(raw_groups)
+
+    # Raw groups that share a requested key (e.g. the days of a month)
+    # become one group; grouping by ('customer_id', 'type') merges nothing
+    final_numbers = defaultdict(itertools.count().__next__)
+    final_index = list(map(final_numbers.__getitem__, final_of))
+    groups = list(final_numbers)
+    size = len(groups)
+    counts = [0] * size
+    if row_groups is None:
+        for group, count in zip(final_index, raw_counts.values()):
+            counts[group] += count
+    else:
+        if len(groups) < len(raw_groups):
+            row_groups = array('i', map(final_index.__getitem__, row_groups))
+        for group, count in Counter(row_groups).items():
+            counts[group] = count
+
+    # Pass 3: one tight loop per (function, field), indexing plain lists
+    sums, minimums, maximums, distinct = {}, {}, {}, {}
+    for name, function, field in specs:
+        if function in ('sum', 'mean') and field not in sums:
+            totals = [0] * size
+            for group, value in zip(row_groups, values(field)):
+                totals[group] += value
+            sums[field] = totals
+        elif function == 'min' and field not in minimums:
+            lowest = [math.inf] * size
+            for group, value in zip(row_groups, values(field)):
+                if value < lowest[group]:
+                    lowest[group] = value
+            minimums[field] = lowest
+        elif function == 'max' and field not in maximums:
+            highest = [-math.inf] * size
+            for group, value in zip(row_groups, values(field)):
+                if value > highest[group]:
+                    highest[group] = value
+            maximums[field] = highest
+        elif function == 'distinct' and field not in distinct:
+            distinct[field] = _distinct_counts(row_groups, values(field), size)
+
+    result = {}
+    for group, final in enumerate(groups):
+        count = counts[group]
+        if not count:
+            # A transaction type with no rows
+            continue
+        row = {}
+        for name, function, field in specs:
+            if function == 'count':
+                row[name] = count
+            elif function == 'sum':
+                row[name] = sums[field][group]
+            elif function == 'mean':
+                row[name] = sums[field][group] / count
+            elif function == 'distinct':
+                row[name] = distinct[field][group]
+            else:
+                value = (minimums if function == 'min' else maximums)[field][group]
+                row[name] = datetime.fromordinal(value) if field == 'date' else value
+        result[final] = row
+    return result
+
+
+def _distinct_counts(row_groups, values, size):
+    """
+    Return [number of different values] per group. Each (group, value) pair
+    is packed into one integer, group * span + (value - lowest), so the set
+    hashes plain integers instead of tuples.
+    """
+    values = array('q', values)
+    counts = [0] * size
+    if not values:
+        return counts
+    lowest = min(values)
+    span = max(values) - lowest + 1
+    pairs = set(map(operator.add, map(operator.mul, row_groups, itertools.repeat(span)),
+                    map(lowest.__rsub__, values)))
+    for group, count in Counter(map(span.__rfloordiv__, pairs)).items():
+        counts[group] = count
+    return counts
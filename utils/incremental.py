@@ -0,0 +1,151 @@
+import csv
+import hashlib
+import io
+import os
+
+from utils.fast_parser import RowParser
+from utils.rejects import RejectedRowSink
+from utils.transaction_table import TransactionTable
+
+# Bytes hashed at each end of the consumed prefix to detect rewrites
+FINGERPRINT_WINDOW = 64 * 1024
+
+
+def _complete_length(data):
+    """
+    Return the length of the leading part of `data` made of complete CSV
+    records, so a row that is still being written is left for next time.
+    A newline inside a quoted field does not end a record.
+    """
+    end = data.rfind(b'\n') + 1
+    while end and data.count(b'"', 0, end) % 2:
+        end = data.rfind(b'\n', 0, end - 1) + 1
+    return end
+
+
+# -----------------------------------------------------
+# INCREMENTAL LOAD for append-only transaction feeds
+# -----------------------------------------------------
+class TailLoader:
+    """
+    Keep a TransactionTable in sync with an append-only CSV file.
+
+    The loader remembers the byte offset it has consumed and a fingerprint
+    of that prefix (SHA-256 of its first and last FINGERPRINT_WINDOW bytes).
+    refresh() then parses only the bytes appended since the previous call,
+    so its cost is proportional to the new data rather than the file size.
+    The prefix counts as rewritten, and refresh() falls back to a full
+    reload, if the file shrank, the fingerprint no longer matches, the file
+    was replaced (another device/inode, e.g. a save through os.replace())
+    or its mtime changed while its size did not (an edit in place).
+
+    Usage:
+        loader = TailLoader('data/financial_transactions.csv')
+        transactions = loader.refresh()   # full load the first time
+        ...
+        transactions = loader.refresh()   # only the newly appended rows
+    """
+
+    def __init__(self, filename='data/financial_transactions.csv'):
+        self.filename = filename
+        self._reset()
+
+    def _reset(self):
+        self.transactions = TransactionTable()
+        self.header = None
+        self.offset = 0
+        self.lines = 0
+        self.fingerprint = None
+        # (st_dev, st_ino, st_size, st_mtime_ns) of the file when last read
+        self.identity = None
+
+    @staticmethod
+    def _fingerprint(f, end):
+        """
+        Hash the first and last FINGERPRINT_WINDOW bytes of f[:end].
+        """
+        digest = hashlib.sha256(str(end).encode())
+        f.seek(0)
+        digest.update(f.read(min(end, FINGERPRINT_WINDOW)))
+        tail_start = max(FINGERPRINT_WINDOW, end - FINGERPRINT_WINDOW)
+        if tail_start < end:
+            f.seek(tail_start)
+            digest.update(f.read(end - tail_start))
+        return digest.digest()
+
+    def _prefix_unchanged(self, f, stat):
+        if self.fingerprint is None or stat.st_size < self.offset:
+            return False
+        dev, ino, size, mtime_ns = self.identity
+        if (stat.st_dev, stat.st_ino) != (dev, ino):
+            return False
+        if stat.st_size == size and stat.st_mtime_ns != mtime_ns:
+            return False
+        return self._fingerprint(f, self.offset) == self.fingerprint
+
+    def refresh(self, rejects=None):
+        """
+        Parse rows appended since the last refresh (or the whole file on the
+        first call or after the prefix changed).
+        Returns the up-to-date TransactionTable. A full reload replaces the
+        table with a new one, so always use the returned object.
+        """
+        owns_sink = rejects is None
+        if owns_sink:
+            rejects = RejectedRowSink()
+        try:
+            with open(self.filename, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                size = stat.st_size
+                full_reload = not self._prefix_unchanged(f, stat)
+                if full_reload:
+                    self._reset()
+                f.seek(self.offset)
+                data = f.read(size - self.offset)
+                length = _complete_length(data)
+                data = data[:length]
+
+                text = data.decode('utf-8')
+                reader = csv.reader(io.StringIO(text, newline=''))
+                if self.header is None:
+                    self.header = next(reader, None)
+                    if self.header is None:
+                        return self.transactions
+                rejects.set_header(self.header)
+                parse = RowParser(self.header).parse
+
+                added = 0
+                for row in reader:
+                    if not row:
+                        continue
+                    try:
+                        self.transactions.append(parse(row))
+                        added += 1
+                    except Exception as e:
+                        rejects.reject(self.lines + reader.line_num, row, e)
+
+                self.lines += data.count(b'\n')
+                self.offset += length
+                self.fingerprint = self._fingerprint(f, self.offset)
+                self.identity = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+            mode = "full reload" if full_reload else "appended rows only"
+            print(f"✅ {added} transactions loaded from {self.filename} ({mode}, "
+                  f"{len(self.transactions)} in total)")
+            if rejects.total:
+                print(f"⚠️ Skipped {rejects.total} invalid rows (details in {rejects.log_path})")
+            return self.transactions
+
+        except FileNotFoundError:
+            print(f"❌ File not found: {self.filename}")
+            return self.transactions
+
+        except Exception as e:
+            # The table may be half-updated; force a full reload next time
+            self.fingerprint = None
+            print(f"❌ Error loading transactions: {e}")
+            return self.transactions
+
+        finally:
+            if owns_sink:
+                rejects.close()
@@ -0,0 +1,194 @@
+from datetime import datetime
+import json
+import os
+
+# fsync the journal after this many records (1 = every edit is durable)
+SYNC_EVERY = 1
+
+
+def journal_path(filename):
+    """
+    Return the write-ahead journal path for a CSV file.
+    """
+    return filename + '.journal'
+
+
+def _encode(key, value):
+    if key == 'date':
+        return value.strftime('%Y-%m-%d')
+    if key == 'amount':
+        return round(value * 100)
+    return value
+
+
+def _decode(key, value):
+    if key == 'date':
+        return datetime.strptime(value, '%Y-%m-%d')
+    if key == 'amount':
+        return value / 100
+    return value
+
+
+# -----------------------------------------------------
+# Append-only log of edits made since the last save
+# -----------------------------------------------------
+class TransactionJournal:
+    """
+    Write-ahead journal for the edits made to a TransactionTable after it
+    was loaded from (or saved to) a CSV file.
+
+    Each append, field update and deletion is written as one short JSON
+    line, e.g. ["u", 12, "amount", 9999], and flushed straight away, so a
+    crash of the program loses nothing. Every `sync_every` records the file
+    is also fsync'ed (group commit): 1 makes each edit durable against a
+    power loss, larger values trade that window for fewer disk syncs.
+
+    The first line records the size and mtime of the CSV the edits apply
+    to. Saving the CSV is a checkpoint that deletes the journal; on the
+    next load the journal is replayed on top of the CSV only if it still
+    matches that checkpoint.
+    """
+
+    def __init__(self, filename, sync_every=SYNC_EVERY):
+        self.filename = filename
+        self.path = journal_path(filename)
+        self.sync_every = sync_every
+        self.base = None
+        self.pending = 0
+        self.records = 0
+        self._file = None
+
+    def _write(self, record):
+        if self._file is None:
+            new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if new:
+                self._file.write(json.dumps({'base': self.base}) + '\n')
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._file.flush()
+        self.records += 1
+        self.pending += 1
+        if self.pending >= self.sync_every:
+            self.sync()
+
+    def record_append(self, transaction):
+        self._write(['a'] + [_encode(key, transaction[key]) for key in
+                             ('transaction_id', 'date', 'customer_id', 'amount', 'type', 'description')])
+
+    def record_update(self, index, key, value):
+        self._write(['u', index, key, _encode(key, value)])
+
+    def record_delete(self, index):
+        self._write(['d', index])
+
+    def sync(self):
+        """
+        Force every record written so far to disk.
+        """
+        if self._file is not None and self.pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self.pending = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def checkpoint(self, base, upto=None):
+        """
+        Called after the table was saved to the CSV: the edits are now in
+        the file, so the journal restarts from `base`, the (size, mtime_ns)
+        of the freshly written CSV. With `upto`, only the first `upto`
+        records were part of the save (e.g. a background save of an earlier
+        snapshot) and the later ones are kept.
+        """
+        self.close()
+        kept = []
+        if upto is not None and os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                kept = [line for line in f.read().split('\n')[1:] if line][upto:]
+        if kept:
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'base': list(base)}) + '\n')
+                f.write('\n'.join(kept) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(self.path + '.tmp', self.path)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        self.base = list(base)
+        self.records = len(kept)
+
+    def replay(self, transactions):
+        """
+        Apply the journal's records to a table freshly loaded from the CSV.
+        A journal written against a different version of the CSV (e.g. a
+        save that crashed after replacing the file) is not applied but
+        renamed to <journal>.stale. Replay stops at a torn or unreadable
+        line, which is cut off so new records follow the last good one.
+        Returns the number of records applied.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding='utf-8') as f:
+            lines = f.read().split('\n')
+
+        try:
+            base = json.loads(lines[0])['base']
+        except (ValueError, KeyError, TypeError):
+            base = None
+        if base != self.base:
+            stale_path = self.path + '.stale'
+            os.replace(self.path, stale_path)
+            print(f"⚠️ Journal does not match {self.filename}; edits not replayed (kept in {stale_path})")
+            return 0
+
+        applied = 0
+        for line_number, line in enumerate(lines[1:], start=2):
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                action = record[0]
+                if action == 'a':
+                    transactions.append({
+                        'transaction_id': record[1],
+                        'date': _decode('date', record[2]),
+                        'customer_id': record[3],
+                        'amount': _decode('amount', record[4]),
+                        'type': record[5],
+                        'description': record[6]
+                    })
+                elif action == 'u':
+                    transactions.set_value(record[1], record[2], _decode(record[2], record[3]))
+                elif action == 'd':
+                    del transactions[record[1]]
+                else:
+                    raise ValueError(f"unknown action {action!r}")
+            except Exception as e:
+                print(f"⚠️ Journal replay stopped at line {line_number}: {e}")
+                with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(lines[:line_number - 1]) + '\n')
+                os.replace(self.path + '.tmp', self.path)
+                break
+            applied += 1
+        self.records = applied
+        return applied
+
+
+# -----------------------------------------------------
+# ATTACH a journal to a freshly loaded table
+# -----------------------------------------------------
+def attach_journal(transactions, filename, sync_every=SYNC_EVERY):
+    """
+    Replay any journal left for `filename` onto `transactions` (which must
+    have just been loaded from it), then attach the journal so later edits
+    are recorded. Returns the number of replayed records.
+    """
+    journal = TransactionJournal(filename, sync_every)
+    journal.base = list(transactions.source[1:])
+    applied = journal.replay(transactions)
+    transactions.journal = journal
+    return applied
@@ -0,0 +1,256 @@
+from array import array
+from datetime import datetime
+import csv
+import io
+import mmap
+
+from utils.compression import codec_for
+from utils.fast_parser import RowParser, load_transactions_fast
+from utils.rejects import RejectedRowSink
+from utils.transaction_table import TransactionTable, TYPE_CODES, parse_cents
+
+# Marker in the `descriptions` column for "still only in the mapped file"
+LAZY = -1
+
+
+# -----------------------------------------------------
+# TransactionTable whose descriptions stay in the file
+# -----------------------------------------------------
+class MappedTransactionTable(TransactionTable):
+    """
+    A TransactionTable backed by a memory-mapped CSV file.
+
+    IDs, dates, customers, amounts and types are decoded into the usual
+    columns while loading, but descriptions are kept as (start, end) byte
+    offsets and lengths into the mapped file and decoded only when a row's description
+    is actually read (view_transactions, a text search, ...). Rows that are
+    added or edited store their description in the string pool as usual.
+
+    The mapping must stay valid while the table is used: do not rewrite or
+    truncate the source file (e.g. save_transactions() to the same path)
+    before calling close(), which decodes the remaining descriptions and
+    releases the mapping.
+    """
+
+    def __init__(self, buffer=None):
+        super().__init__()
+        self.buffer = buffer
+        self.desc_starts = array('q')
+        self.desc_lengths = array('i')
+
+    def append(self, transaction):
+        super().append(transaction)
+        self.desc_starts.append(0)
+        self.desc_lengths.append(0)
+
+    def append_mapped(self, transaction_id, date_ordinal, customer_id, cents, type_code,
+                      desc_start, desc_length):
+        """
+        Add a row whose description is desc_length bytes at desc_start.
+        """
+        self.ids.append(transaction_id)
+        self.dates.append(date_ordinal)
+        self.customers.append(customer_id)
+        self.cents.append(cents)
+        self.types.append(type_code)
+        self.descriptions.append(LAZY)
+        self.desc_starts.append(desc_start)
+        self.desc_lengths.append(desc_length)
+
+    def extend_table(self, other):
+        """
+        Append the rows of a regular (fully decoded) TransactionTable.
+        """
+        super().extend_table(other)
+        self.desc_starts.extend(array('q', bytes(8 * len(other))))
+        self.desc_lengths.extend(array('i', bytes(4 * len(other))))
+
+    def take(self, indexes):
+        """
+        Return a regular TransactionTable with the given rows; descriptions
+        are decoded first so the copy does not depend on the mapping.
+        """
+        self.materialize()
+        return super().take(indexes)
+
+    def copy(self):
+        """
+        Return a regular TransactionTable copy; descriptions are decoded
+        first so the copy does not depend on the mapping.
+        """
+        self.materialize()
+        return super().copy()
+
+    def get_value(self, index, key):
+        if key == 'description' and self.descriptions[index] == LAZY:
+            start = self.desc_starts[index]
+            raw = self.buffer[start:start + self.desc_lengths[index]]
+            return raw.decode('utf-8').strip()
+        return super().get_value(index, key)
+
+    def materialize(self):
+        """
+        Decode every remaining description into the string pool.
+        """
+        for index in range(len(self)):
+            if self.descriptions[index] == LAZY:
+                self.descriptions[index] = self.pool.intern(self.get_value(index, 'description'))
+
+    def close(self):
+        """
+        Decode the remaining descriptions and release the file mapping.
+        The table stays fully usable afterwards.
+        """
+        if self.buffer is not None:
+            self.materialize()
+            self.buffer.close()
+            self.buffer = None
+
+    def memory_usage(self):
+        return (super().memory_usage()
+                + self.desc_starts.buffer_info()[1] * self.desc_starts.itemsize
+                + self.desc_lengths.buffer_info()[1] * self.desc_lengths.itemsize)
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        del self.desc_starts[index]
+        del self.desc_lengths[index]
+
+
+# -----------------------------------------------------
+# HELPER FUNCTION: Read one complete CSV record
+# -----------------------------------------------------
+def _read_record(buffer, line):
+    """
+    Extend `line` with following lines until its quotes are balanced, so
+    quoted fields containing newlines are read as one record.
+    Returns (record bytes, number of physical lines).
+    """
+    lines = 1
+    while line.count(b'"') % 2:
+        more = buffer.readline()
+        if not more:
+            break
+        line += more
+        lines += 1
+    return line, lines
+
+
+# -----------------------------------------------------
+# MMAP LOAD transactions from CSV file
+# -----------------------------------------------------
+def load_transactions_mmap(filename='data/financial_transactions.csv', rejects=None):
+    """
+    Load transactions through a memory-mapped, lazily decoded reader.
+
+    Plain rows are split directly on the mapped bytes: numbers, dates and
+    types are decoded eagerly (dates and types through per-value caches),
+    while descriptions are only recorded as byte offsets. Rows with quoted
+    fields, and rows the fast path rejects, go through RowParser so results
+    and logged errors match load_transactions().
+    Returns a MappedTransactionTable (see its notes on keeping the file
+    unchanged until close()). Compressed files cannot be mapped and are
+    loaded with load_transactions_fast() into a regular TransactionTable.
+    """
+    if codec_for(filename):
+        return load_transactions_fast(filename, rejects)
+    owns_sink = rejects is None
+    if owns_sink:
+        rejects = RejectedRowSink()
+    try:
+        with open(filename, 'rb') as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                print(f"✅ 0 transactions successfully loaded from {filename}")
+                return TransactionTable()
+
+        transactions = MappedTransactionTable(buffer)
+        header_line, line_number = _read_record(buffer, buffer.readline())
+        header = next(csv.reader(io.StringIO(header_line.decode('utf-8'), newline='')), [])
+        rejects.set_header(header)
+        parser = RowParser(header)
+        width = len(header)
+        if parser.complete:
+            i_id, i_date, i_cust, i_amount, i_type, i_desc = parser.positions
+        dates = {}
+        types = {}
+
+        readline = buffer.readline
+        debit = TYPE_CODES['debit']
+        desc_is_last = parser.complete and i_desc == width - 1
+        pos = buffer.tell()
+        line = readline()
+        while line:
+            line_number += 1
+            next_pos = pos + len(line)
+            body = line.rstrip(b'\n')
+            if body.endswith(b'\r'):
+                body = body[:-1]
+            fields = body.split(b',')
+            if (parser.complete and len(fields) == width
+                    and b'"' not in body and b'\r' not in body):
+                try:
+                    raw_type = fields[i_type]
+                    type_code = types.get(raw_type)
+                    if type_code is None:
+                        type_code = TYPE_CODES[parser.parse_type(raw_type.decode('utf-8'))]
+                        types[raw_type] = type_code
+                    cents = parse_cents(fields[i_amount])
+                    if type_code == debit:
+                        cents = -abs(cents)
+                    raw_date = fields[i_date]
+                    ordinal = dates.get(raw_date)
+                    if ordinal is None:
+                        ordinal = datetime.strptime(raw_date.decode('utf-8'), '%Y-%m-%d').toordinal()
+                        dates[raw_date] = ordinal
+                    desc_length = len(fields[i_desc])
+                    if desc_is_last:
+                        desc_start = pos + len(body) - desc_length
+                    else:
+                        desc_start = pos + sum(len(field) + 1 for field in fields[:i_desc])
+                    transactions.append_mapped(
+                        int(fields[i_id]), ordinal, int(fields[i_cust]), cents,
+                        type_code, desc_start, desc_length)
+                    pos = next_pos
+                    line = readline()
+                    continue
+                except Exception:
+                    pass
+
+            # Slow path: quoted fields, odd rows and errors
+            record, lines = _read_record(buffer, line)
+            line_number += lines - 1
+            values = next(csv.reader(io.StringIO(record.decode('utf-8'), newline='')), [])
+            if values:
+                try:
+                    transactions.append(parser.parse(values))
+                except Exception as e:
+                    rejects.reject(line_number, values, e)
+            pos = buffer.tell()
+            line = readline()
+
+        transactions.mark_clean(filename)
+
+        # The scan touched every page; drop them from this process's resident
+        # set; descriptions that are read later fault back in from the cache
+        if hasattr(mmap, 'MADV_DONTNEED'):
+            buffer.madvise(mmap.MADV_DONTNEED)
+
+        print(f"✅ {len(transactions)} transactions successfully loaded from {filename}")
+        if rejects.total:
+            print(f"⚠️ Skipped {rejects.total} invalid rows (details in {rejects.log_path})")
+        return transactions
+
+    except FileNotFoundError:
+        print(f"❌ File not found: {filename}")
+        return TransactionTable()
+
+    except Exception as e:
+        print(f"❌ Error loading transactions: {e}")
+        return TransactionTable()
+
+    finally:
+        if owns_sink:
+            rejects.close()
@@ -0,0 +1,210 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+import calendar
+import glob
+import json
+import os
+import re
+
+from utils.compression import CODECS
+from utils.fast_parser import iter_transactions_fast
+from utils.rejects import RejectedRowSink
+from utils.transaction_table import TransactionTable
+
+# Per-directory cache of each partition's min/max transaction date
+INDEX_FILENAME = '.transaction_index.json'
+# 2019, 2019-03, 2019_03 or 201903 somewhere in a file name
+NAME_PERIOD = re.compile(r'(?<!\d)((?:19|20)\d{2})(?:[-_]?(0[1-9]|1[0-2]))?(?!\d)')
+
+
+# -----------------------------------------------------
+# HELPER FUNCTIONS: Find partitions and their date ranges
+# -----------------------------------------------------
+def list_partitions(source):
+    """
+    Return the sorted CSV files (plain or .gz/.bz2/.xz compressed) for a
+    directory or a glob pattern.
+    """
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, '*.csv'))
+        for extension in CODECS:
+            paths += glob.glob(os.path.join(source, '*.csv' + extension))
+    else:
+        paths = glob.glob(source)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def name_date_range(filename):
+    """
+    Derive a (first, last) date ordinal range from a partition's name,
+    e.g. 'transactions_2019-03.csv' -> March 2019, '2019.csv' -> all of 2019.
+    Returns None if the name carries no year.
+    """
+    match = NAME_PERIOD.search(os.path.basename(filename))
+    if not match:
+        return None
+    year = int(match.group(1))
+    if match.group(2):
+        month = int(match.group(2))
+        last_day = calendar.monthrange(year, month)[1]
+        return date(year, month, 1).toordinal(), date(year, month, last_day).toordinal()
+    return date(year, 1, 1).toordinal(), date(year, 12, 31).toordinal()
+
+
+def _load_index(directory):
+    try:
+        with open(os.path.join(directory, INDEX_FILENAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(directory, index):
+    path = os.path.join(directory, INDEX_FILENAME)
+    try:
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+        os.replace(path + '.tmp', path)
+    except OSError as e:
+        print(f"⚠️ Could not update partition index {path}: {e}")
+
+
+def partition_range(index, filename):
+    """
+    Return the (min, max) date ordinals a partition can contain: the range
+    recorded in the index while the file is unchanged, otherwise the range
+    implied by its name, otherwise None (unknown, so the file must be read).
+    A file recorded with no valid rows has the empty range (1, 0).
+    """
+    entry = index.get(os.path.basename(filename))
+    if entry:
+        stat = os.stat(filename)
+        if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return tuple(entry['range']) if entry['range'] else (1, 0)
+    return name_date_range(filename)
+
+
+def _overlaps(date_range, start, end):
+    first, last = date_range
+    if first > last:
+        return False
+    return (end is None or first <= end) and (start is None or last >= start)
+
+
+def _to_ordinal(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.strptime(value, '%Y-%m-%d')
+    return value.toordinal()
+
+
+# -----------------------------------------------------
+# WORKER: Load one partition
+# -----------------------------------------------------
+class _CollectedRejects:
+    """
+    Stand-in for RejectedRowSink inside workers: keeps rejected rows in a
+    list so the parent process can log them in partition order.
+    """
+
+    def __init__(self):
+        self.header = None
+        self.records = []
+
+    def set_header(self, header):
+        self.header = list(header)
+
+    def reject(self, line_number, raw_row, reason):
+        self.records.append((line_number, raw_row, str(reason)))
+
+
+def _load_partition(task):
+    """
+    Parse one partition and keep only rows inside [start, end].
+    Returns (filename, table, (min, max) of all rows or None, rejects).
+    """
+    filename, start, end = task
+    rejects = _CollectedRejects()
+    table = TransactionTable(iter_transactions_fast(filename, rejects))
+    date_range = (min(table.dates), max(table.dates)) if len(table) else None
+    if start is not None or end is not None:
+        low = start if start is not None else date.min.toordinal()
+        high = end if end is not None else date.max.toordinal()
+        table = table.take(i for i, day in enumerate(table.dates) if low <= day <= high)
+    return filename, table, date_range, rejects
+
+
+# -----------------------------------------------------
+# MULTI-FILE LOAD with date-range partition pruning
+# -----------------------------------------------------
+def load_transactions_multi(source='data', start_date=None, end_date=None, workers=None,
+                            rejects=None):
+    """
+    Load and merge every CSV partition in a directory (or matching a glob).
+
+    With start_date and/or end_date (date, datetime or 'YYYY-MM-DD'), whole
+    files are skipped when their date range cannot overlap the request. The
+    range comes from the partition index (min/max dates recorded the last
+    time the unchanged file was loaded) or, failing that, from a year or
+    year-month in the file name. Rows outside the range are dropped from
+    the files that are read.
+    Files are parsed concurrently in a process pool (`workers` processes,
+    default os.cpu_count()) and merged in file-name order.
+    Returns a TransactionTable.
+    """
+    start = _to_ordinal(start_date)
+    end = _to_ordinal(end_date)
+    owns_sink = rejects is None
+    if owns_sink:
+        rejects = RejectedRowSink()
+    try:
+        partitions = list_partitions(source)
+        indexes = {}
+        selected = []
+        for filename in partitions:
+            directory = os.path.dirname(filename) or '.'
+            index = indexes.setdefault(directory, _load_index(directory))
+            if start is not None or end is not None:
+                date_range = partition_range(index, filename)
+                if date_range is not None and not _overlaps(date_range, start, end):
+                    continue
+            selected.append(filename)
+
+        tasks = [(filename, start, end) for filename in selected]
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(tasks) <= 1:
+            results = list(map(_load_partition, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                results = list(executor.map(_load_partition, tasks))
+
+        transactions = TransactionTable()
+        for filename, table, date_range, collected in results:
+            transactions.extend_table(table)
+            rejects.set_header(collected.header or [])
+            for line_number, raw_row, reason in collected.records:
+                rejects.reject(line_number, raw_row, f"{os.path.basename(filename)}: {reason}")
+            stat = os.stat(filename)
+            directory = os.path.dirname(filename) or '.'
+            indexes[directory][os.path.basename(filename)] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'range': list(date_range) if date_range else None
+            }
+        for directory in {os.path.dirname(filename) or '.' for filename in selected}:
+            _save_index(directory, indexes[directory])
+
+        print(f"✅ {len(transactions)} transactions successfully loaded from "
+              f"{len(selected)} of {len(partitions)} files in {source}")
+        if rejects.total:
+            print(f"⚠️ Skipped {rejects.total} invalid rows (details in {rejects.log_path})")
+        return transactions
+
+    except Exception as e:
+        print(f"❌ Error loading transactions: {e}")
+        return TransactionTable()
+
+    finally:
+        if owns_sink:
+            rejects.close()
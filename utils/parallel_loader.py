@@ -0,0 +1,185 @@
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import io
+import mmap
+import os
+
+from utils.compression import codec_for
+from utils.fast_parser import RowParser, load_transactions_fast
+from utils.rejects import RejectedRowSink
+from utils.transaction_table import TransactionTable
+
+# Files smaller than this are parsed in-process; a pool would only add overhead
+MIN_PARALLEL_BYTES = 4 * 1024 * 1024
+# mmap has no count(), so counting walks the buffer in slices of this size
+COUNT_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def _count(buffer, needle, start, end):
+    """
+    Count occurrences of a single byte in buffer[start:end] without copying
+    more than COUNT_BLOCK_BYTES at a time.
+    """
+    total = 0
+    for block_start in range(start, end, COUNT_BLOCK_BYTES):
+        total += buffer[block_start:min(end, block_start + COUNT_BLOCK_BYTES)].count(needle)
+    return total
+
+
+# -----------------------------------------------------
+# HELPER FUNCTION: Find record-aligned byte ranges
+# -----------------------------------------------------
+def _next_record_end(buffer, start, parity=0):
+    """
+    Return the offset just past the first newline at or after `start` that
+    ends a CSV record. A newline inside a quoted field is not a record end:
+    a record ends only where the number of quote characters seen since the
+    last record boundary is even (escaped "" quotes count twice, so they
+    keep the parity intact). `parity` is the quote parity at `start`.
+    """
+    pos = start
+    while True:
+        newline = buffer.find(b'\n', pos)
+        if newline == -1:
+            return len(buffer)
+        parity = (parity + _count(buffer, b'"', pos, newline)) % 2
+        if parity == 0:
+            return newline + 1
+        pos = newline + 1
+
+
+def split_into_ranges(buffer, chunks):
+    """
+    Split a CSV buffer into at most `chunks` byte ranges that each start and
+    end on record boundaries, including files with quoted descriptions that
+    contain commas and newlines.
+    Returns (header_end, ranges) where ranges is a list of
+    (start, end, lines_before) tuples and lines_before is the number of
+    physical lines that precede `start` in the file.
+    """
+    size = len(buffer)
+    header_end = _next_record_end(buffer, 0)
+    boundaries = [header_end]
+    for k in range(1, chunks):
+        target = header_end + (size - header_end) * k // chunks
+        last = boundaries[-1]
+        if target <= last:
+            continue
+        parity = _count(buffer, b'"', last, target) % 2
+        boundary = _next_record_end(buffer, target, parity)
+        if boundary >= size:
+            break
+        if boundary > last:
+            boundaries.append(boundary)
+    boundaries.append(size)
+
+    ranges = []
+    lines_before = _count(buffer, b'\n', 0, header_end)
+    for start, end in zip(boundaries, boundaries[1:]):
+        if start < end:
+            ranges.append((start, end, lines_before))
+        lines_before += _count(buffer, b'\n', start, end)
+    return header_end, ranges
+
+
+# -----------------------------------------------------
+# WORKER: Parse one byte range into a TransactionTable
+# -----------------------------------------------------
+def _parse_range(task):
+    """
+    Parse the rows in one byte range of the file.
+    Runs in a worker process, so it returns plain picklable results:
+    a TransactionTable and a list of (line_number, raw_row, reason) rejects.
+    """
+    filename, header, start, end, lines_before = task
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+
+    table = TransactionTable()
+    rejected = []
+    parse = RowParser(header).parse
+    reader = csv.reader(io.StringIO(text, newline=''))
+    for row in reader:
+        if not row:
+            continue
+        try:
+            table.append(parse(row))
+        except Exception as e:
+            rejected.append((lines_before + reader.line_num, row, str(e)))
+    return table, rejected
+
+
+def _merge_results(transactions, rejects, results):
+    """
+    Append worker results in range order and replay their rejected rows.
+    """
+    for table, rejected in results:
+        transactions.extend_table(table)
+        for line_number, raw_row, reason in rejected:
+            rejects.reject(line_number, raw_row, reason)
+
+
+# -----------------------------------------------------
+# PARALLEL LOAD transactions from CSV file
+# -----------------------------------------------------
+def load_transactions_parallel(filename='data/financial_transactions.csv', workers=None,
+                               rejects=None, chunks_per_worker=4):
+    """
+    Load transactions from a CSV file using a pool of worker processes.
+
+    The file is split into record-aligned byte ranges (quoted fields with
+    commas or newlines are handled), each range is parsed by RowParser in a
+    separate process, and the results are merged in original file order.
+    Rejected rows are logged exactly like load_transactions(), with their
+    line numbers in the original file.
+      - workers: number of processes (default: os.cpu_count())
+      - chunks_per_worker: ranges per worker, to even out uneven chunks
+    Compressed files cannot be split by byte offset, so they are streamed
+    through load_transactions_fast() instead.
+    Returns a TransactionTable.
+    """
+    if codec_for(filename):
+        return load_transactions_fast(filename, rejects)
+    workers = workers or os.cpu_count() or 1
+    owns_sink = rejects is None
+    if owns_sink:
+        rejects = RejectedRowSink()
+    try:
+        with open(filename, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                ranges, header = [], []
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    chunks = 1 if workers == 1 or size < MIN_PARALLEL_BYTES else workers * chunks_per_worker
+                    header_end, ranges = split_into_ranges(buffer, chunks)
+                    header_text = buffer[:header_end].decode('utf-8')
+                    header = next(csv.reader(io.StringIO(header_text, newline='')), [])
+
+        rejects.set_header(header)
+        tasks = [(filename, header, start, end, lines_before) for start, end, lines_before in ranges]
+        transactions = TransactionTable()
+        if len(tasks) <= 1:
+            _merge_results(transactions, rejects, map(_parse_range, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                _merge_results(transactions, rejects, executor.map(_parse_range, tasks))
+        transactions.mark_clean(filename)
+
+        print(f"✅ {len(transactions)} transactions successfully loaded from {filename}")
+        if rejects.total:
+            print(f"⚠️ Skipped {rejects.total} invalid rows (details in {rejects.log_path})")
+        return transactions
+
+    except FileNotFoundError:
+        print(f"❌ File not found: {filename}")
+        return TransactionTable()
+
+    except Exception as e:
+        print(f"❌ Error loading transactions: {e}")
+        return TransactionTable()
+
+    finally:
+        if owns_sink:
+            rejects.close()
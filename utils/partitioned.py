@@ -0,0 +1,246 @@
+from datetime import date
+import json
+import os
+
+from utils.analysis import replace_csv
+from utils.fast_parser import iter_transactions_fast
+from utils.rejects import RejectedRowSink
+from utils.transaction_table import TransactionTable
+
+MANIFEST_FILENAME = 'manifest.json'
+GRANULARITIES = ('year', 'month')
+
+
+def _to_iso(value):
+    if value is None or isinstance(value, str):
+        return value
+    return value.strftime('%Y-%m-%d')
+
+
+# -----------------------------------------------------
+# Partitioned CSV storage: one file per year or month
+# -----------------------------------------------------
+class PartitionedStorage:
+    """
+    Keep transactions in a directory of CSV files, one per year
+    ('2019.csv') or per month ('2019-03.csv').
+
+    manifest.json records the granularity and, for every partition, its
+    file, row count, min/max transaction ID, min/max date and the file's
+    size and mtime when it was written.
+
+    save() rewrites only the partitions affected since the table was
+    loaded or last saved: those holding new rows, and those a modified or
+    deleted row was in before or after the change (see the table's
+    touched_dates). load(start_date, end_date) reads only the partitions
+    whose date range overlaps the request.
+
+    A table from such a partial load records in table.partition_scope the
+    directory and partitions it holds, plus ({key: rows}) the on-disk rows
+    of other partitions it has saved rows into. Any PartitionedStorage of
+    that directory then merges those rows back in instead of treating the
+    table as the whole dataset.
+
+    Rows come back grouped by partition, in partition order; within a
+    partition they keep the order they had in memory when it was saved.
+    """
+
+    def __init__(self, directory='data/partitions', granularity=None):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+        manifest = self._read_manifest()
+        self.granularity = manifest.get('granularity') or granularity or 'year'
+        if self.granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown partition granularity: {self.granularity}")
+        if granularity and granularity != self.granularity:
+            print(f"⚠️ {self.directory} is partitioned by {self.granularity}; "
+                  f"ignoring granularity={granularity!r}")
+
+    # -------------------------------------------------
+    # Manifest
+    # -------------------------------------------------
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, partitions):
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = {'granularity': self.granularity, 'partitions': partitions}
+        with open(self.manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+
+    def partitions(self):
+        """
+        Return the manifest's {key: entry} dictionary of partitions.
+        """
+        return self._read_manifest().get('partitions', {})
+
+    def partition_key(self, ordinal):
+        day = date.fromordinal(ordinal)
+        if self.granularity == 'year':
+            return f"{day.year:04d}"
+        return f"{day.year:04d}-{day.month:02d}"
+
+    def _row_keys(self, transactions, indexes):
+        """
+        Return {partition key: [row positions]} for the given rows,
+        computing each distinct date's key once.
+        """
+        keys = {}
+        groups = {}
+        dates = transactions.dates
+        for i in indexes:
+            ordinal = dates[i]
+            key = keys.get(ordinal)
+            if key is None:
+                key = keys[ordinal] = self.partition_key(ordinal)
+            groups.setdefault(key, []).append(i)
+        return groups
+
+    # -------------------------------------------------
+    # Load
+    # -------------------------------------------------
+    def load(self, start_date=None, end_date=None, rejects=None):
+        """
+        Load the partitions overlapping [start_date, end_date] (dates,
+        datetimes or 'YYYY-MM-DD'; both None loads everything).
+        Whole partitions are loaded, so the table can be edited and saved;
+        rows outside the range are still in it.
+        """
+        start = _to_iso(start_date)
+        end = _to_iso(end_date)
+        partitions = self.partitions()
+        if not partitions:
+            print(f"❌ No partitions found in {self.directory}")
+            return TransactionTable()
+
+        owns_sink = rejects is None
+        if owns_sink:
+            rejects = RejectedRowSink()
+        try:
+            selected = []
+            for key in sorted(partitions):
+                entry = partitions[key]
+                if start is not None and entry['max_date'] < start:
+                    continue
+                if end is not None and entry['min_date'] > end:
+                    continue
+                selected.append(key)
+
+            transactions = TransactionTable()
+            for key in selected:
+                path = os.path.join(self.directory, partitions[key]['file'])
+                transactions.extend_table(TransactionTable(iter_transactions_fast(path, rejects)))
+            transactions.mark_clean(self.manifest_path)
+
+            if len(selected) < len(partitions):
+                # Kept on the table, so any PartitionedStorage of this
+                # directory saves it as the partial table it is
+                transactions.partition_scope = {
+                    'manifest': os.path.abspath(self.manifest_path),
+                    'keys': set(selected),
+                    'outside': {}
+                }
+
+            print(f"✅ {len(transactions)} transactions successfully loaded from "
+                  f"{len(selected)} of {len(partitions)} partitions in {self.directory}")
+            if rejects.total:
+                print(f"⚠️ Skipped {rejects.total} invalid rows (details in {rejects.log_path})")
+            return transactions
+
+        except Exception as e:
+            print(f"❌ Error loading transactions: {e}")
+            return TransactionTable()
+
+        finally:
+            if owns_sink:
+                rejects.close()
+
+    # -------------------------------------------------
+    # Save
+    # -------------------------------------------------
+    def save(self, transactions):
+        """
+        Write the affected partitions and update the manifest.
+        A table that was not loaded from (or saved to) this unchanged
+        layout is written out completely, replacing every partition.
+        """
+        if not isinstance(transactions, TransactionTable):
+            transactions = TransactionTable(transactions)
+        scope = transactions.partition_scope
+        partial = scope is not None and scope['manifest'] == os.path.abspath(self.manifest_path)
+        try:
+            partitions = self.partitions()
+            if transactions.loaded_from(self.manifest_path):
+                dirty = {self.partition_key(ordinal) for ordinal in transactions.touched_dates}
+                dirty.update(self._row_keys(transactions,
+                                            range(transactions.persisted_rows, len(transactions))))
+            elif partial:
+                print("❌ The partitions changed on disk since this date range was loaded; "
+                      "reload before saving.")
+                return
+            else:
+                dirty = set(partitions) | set(self._row_keys(transactions, range(len(transactions))))
+
+            if not dirty:
+                print(f"💾 No changes to save to {self.directory}")
+                return
+
+            groups = self._row_keys(transactions, range(len(transactions)))
+            os.makedirs(self.directory, exist_ok=True)
+            for key in sorted(dirty):
+                rows = transactions.take(groups.get(key, []))
+                if partial and key not in scope['keys']:
+                    # The table only holds its own rows of a partition that
+                    # was not loaded: keep the rows already on disk the first
+                    # time, and merge them in on this and every later save
+                    outside = scope['outside']
+                    if key not in outside:
+                        outside[key] = TransactionTable()
+                        if key in partitions:
+                            path = os.path.join(self.directory, partitions[key]['file'])
+                            outside[key] = TransactionTable(iter_transactions_fast(path))
+                    merged = outside[key].copy()
+                    merged.extend_table(rows)
+                    rows = merged
+                self._write_partition(partitions, key, rows)
+
+            self._write_manifest(partitions)
+            transactions.mark_clean(self.manifest_path)
+            print(f"💾 {len(dirty)} partitions rewritten in {self.directory} "
+                  f"({len(partitions)} partitions in total)")
+
+        except Exception as e:
+            print(f"❌ Error saving transactions: {e}")
+
+    def _write_partition(self, partitions, key, rows):
+        """
+        Rewrite (or delete, if empty) one partition file and update its
+        manifest entry in `partitions`.
+        """
+        filename = f"{key}.csv"
+        path = os.path.join(self.directory, filename)
+        if not len(rows):
+            if os.path.exists(path):
+                os.remove(path)
+            partitions.pop(key, None)
+            return
+        replace_csv(rows, path)
+        stat = os.stat(path)
+        partitions[key] = {
+            'file': filename,
+            'rows': len(rows),
+            'min_id': min(rows.ids),
+            'max_id': max(rows.ids),
+            'min_date': date.fromordinal(min(rows.dates)).isoformat(),
+            'max_date': date.fromordinal(max(rows.dates)).isoformat(),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns
+        }
+
+    def can_query(self, transactions):
+        return False
@@ -0,0 +1,234 @@
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+import mmap
+import os
+import struct
+
+from utils.transaction_table import TransactionTable, TRANSACTION_TYPES
+
+# -----------------------------------------------------
+# Fixed-width binary record layout
+# -----------------------------------------------------
+# <name>.rec:  header, then one RECORD per transaction, in table order
+# <name>.heap: the distinct descriptions as UTF-8 bytes, back to back
+# <name>.idx:  only when IDs are not ascending: (transaction_id, position)
+#              pairs sorted by ID, for binary search
+# Header: magic, record count, heap size in bytes, IDs ascending (0/1)
+# Record: transaction_id, date ordinal, customer_id, cents, type code,
+#         description offset and length in the heap
+MAGIC = b'SFAREC01'
+HEADER = struct.Struct('<8sQQB')
+RECORD = struct.Struct('<qiqqbQI')
+INDEX_ENTRY = struct.Struct('<qQ')
+ID_FIELD = struct.Struct('<q')
+
+
+def heap_path(path):
+    return path + '.heap'
+
+
+def index_path(path):
+    return path + '.idx'
+
+
+def _replace_with(path, data_writer):
+    with open(path + '.tmp', 'wb') as f:
+        data_writer(f)
+    os.replace(path + '.tmp', path)
+
+
+# -----------------------------------------------------
+# EXPORT a table to a record file
+# -----------------------------------------------------
+def export_records(transactions, path):
+    """
+    Write `transactions` to a fixed-width record file `path` plus its
+    description heap (and an ID index if IDs are not in ascending order).
+    Each distinct description is stored once in the heap.
+    Returns the number of records written.
+    """
+    if not isinstance(transactions, TransactionTable):
+        transactions = TransactionTable(transactions)
+
+    heap = bytearray()
+    locations = {}
+    records = bytearray(RECORD.size * len(transactions))
+    ids = transactions.ids
+    pack_into = RECORD.pack_into
+    for i in range(len(transactions)):
+        text = transactions.get_value(i, 'description')
+        location = locations.get(text)
+        if location is None:
+            data = text.encode('utf-8')
+            location = locations[text] = (len(heap), len(data))
+            heap += data
+        pack_into(records, i * RECORD.size, ids[i], transactions.dates[i], transactions.customers[i],
+                  transactions.cents[i], transactions.types[i], location[0], location[1])
+
+    ascending = all(ids[i] <= ids[i + 1] for i in range(len(ids) - 1))
+    _replace_with(heap_path(path), lambda f: f.write(heap))
+    if ascending:
+        if os.path.exists(index_path(path)):
+            os.remove(index_path(path))
+    else:
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        index = bytearray(INDEX_ENTRY.size * len(order))
+        for slot, position in enumerate(order):
+            INDEX_ENTRY.pack_into(index, slot * INDEX_ENTRY.size, ids[position], position)
+        _replace_with(index_path(path), lambda f: f.write(index))
+
+    def write_records(f):
+        f.write(HEADER.pack(MAGIC, len(transactions), len(heap), int(ascending)))
+        f.write(records)
+    _replace_with(path, write_records)
+    return len(transactions)
+
+
+# -----------------------------------------------------
+# Memory-mapped random access to a record file
+# -----------------------------------------------------
+class RecordFile:
+    """
+    Read a record file written by export_records() through mmap.
+
+    Record i lives at a fixed offset, so record_file[i] reads one record
+    (and its description from the heap) without touching the rest of the
+    file. find(transaction_id) binary-searches the IDs: directly in the
+    records when they are ascending, otherwise in the .idx file.
+
+    Usage:
+        with RecordFile('data/archive.rec') as records:
+            first = records[0]
+            match = records.find(1042)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._files = []
+        self.records = self._map(path)
+        magic, self.count, heap_size, self.ascending = HEADER.unpack_from(self.records, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a transaction record file")
+        if len(self.records) != HEADER.size + self.count * RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+        self.heap = self._map(heap_path(path)) if heap_size else b''
+        if len(self.heap) != heap_size:
+            self.close()
+            raise ValueError(f"{heap_path(path)} does not match {path}")
+        self.index = None if self.ascending else self._map(index_path(path))
+
+    def _map(self, path):
+        f = open(path, 'rb')
+        self._files.append(f)
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return self.count
+
+    def record(self, index):
+        """
+        Return the raw field tuple of record `index`:
+        (id, date ordinal, customer, cents, type code, heap offset, heap length).
+        """
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("record index out of range")
+        return RECORD.unpack_from(self.records, HEADER.size + index * RECORD.size)
+
+    def __getitem__(self, index):
+        """
+        Return record `index` as a transaction dictionary.
+        """
+        transaction_id, ordinal, customer_id, cents, type_code, offset, length = self.record(index)
+        return {
+            'transaction_id': transaction_id,
+            'date': datetime.fromordinal(ordinal),
+            'customer_id': customer_id,
+            'amount': cents / 100,
+            'type': TRANSACTION_TYPES[type_code],
+            'description': self.heap[offset:offset + length].decode('utf-8')
+        }
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def _id_at(self, slot):
+        if self.ascending:
+            return ID_FIELD.unpack_from(self.records, HEADER.size + slot * RECORD.size)[0]
+        return ID_FIELD.unpack_from(self.index, slot * INDEX_ENTRY.size)[0]
+
+    def position_of(self, transaction_id):
+        """
+        Return the index of the first record with this ID, or None.
+        """
+        slot = bisect_left(range(self.count), transaction_id, key=self._id_at)
+        if slot == self.count or self._id_at(slot) != transaction_id:
+            return None
+        if self.ascending:
+            return slot
+        return INDEX_ENTRY.unpack_from(self.index, slot * INDEX_ENTRY.size)[1]
+
+    def find(self, transaction_id):
+        """
+        Return the transaction with this ID as a dictionary, or None.
+        """
+        position = self.position_of(transaction_id)
+        return None if position is None else self[position]
+
+    def to_table(self):
+        """
+        Decode every record into a TransactionTable, reading each distinct
+        description from the heap once.
+        """
+        columns = [array(typecode) for typecode in ('q', 'i', 'q', 'q', 'b', 'i')]
+        ids, dates, customers, cents, types, descriptions = columns
+        strings = []
+        string_ids = {}
+        for transaction_id, ordinal, customer_id, amount, type_code, offset, length in \
+                RECORD.iter_unpack(self.records[HEADER.size:]):
+            ids.append(transaction_id)
+            dates.append(ordinal)
+            customers.append(customer_id)
+            cents.append(amount)
+            types.append(type_code)
+            # An empty description shares its offset with the next string,
+            # so the length is part of the key
+            string_id = string_ids.get((offset, length))
+            if string_id is None:
+                string_id = string_ids[(offset, length)] = len(strings)
+                strings.append(self.heap[offset:offset + length].decode('utf-8'))
+            descriptions.append(string_id)
+        return TransactionTable.from_columns(columns, strings)
+
+    def close(self):
+        for mapped in (getattr(self, 'records', None), getattr(self, 'heap', None),
+                       getattr(self, 'index', None)):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+        for f in self._files:
+            f.close()
+        self._files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# -----------------------------------------------------
+# IMPORT a record file into a table
+# -----------------------------------------------------
+def import_records(path):
+    """
+    Load every record of `path` into a TransactionTable.
+    """
+    with RecordFile(path) as records:
+        return records.to_table()
@@ -0,0 +1,109 @@
+from collections import Counter
+import csv
+import io
+import re
+
+# -----------------------------------------------------
+# Buffered sink for rows rejected while loading a CSV
+# -----------------------------------------------------
+class RejectedRowSink:
+    """
+    Collect rows that fail parsing during a load.
+
+    The error log is opened once (on the first rejection) and written through
+    a large buffer instead of being reopened for every bad row. Each record
+    holds the source line number, the raw row and the failure reason.
+    Optionally the raw rows are also copied to a quarantine CSV with the
+    original header plus 'source_line' and 'reject_reason' columns, so they
+    can be fixed and loaded again. close() appends a per-reason count summary.
+
+    Usage:
+        with RejectedRowSink(quarantine_path='data/rejected.csv') as rejects:
+            transactions = load_transactions(rejects=rejects)
+    """
+
+    def __init__(self, log_path='errors.txt', quarantine_path=None, buffer_size=1 << 16):
+        self.log_path = log_path
+        self.quarantine_path = quarantine_path
+        self.buffer_size = buffer_size
+        self.header = None
+        self.counts = Counter()
+        self._log = None
+        self._quarantine = None
+        self._quarantine_writer = None
+
+    @staticmethod
+    def reason_key(reason):
+        """
+        Group failure messages by hiding the row-specific quoted values,
+        e.g. "could not convert string to float: 'abc'" -> "...: '…'".
+        """
+        return re.sub(r"'[^']*'", "'…'", str(reason))
+
+    @staticmethod
+    def format_row(raw_row):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='').writerow(
+            ['' if value is None else value for value in raw_row])
+        return buffer.getvalue()
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def set_header(self, header):
+        """
+        Remember the source header, used as the quarantine CSV's header.
+        """
+        self.header = list(header)
+
+    def reject(self, line_number, raw_row, reason):
+        """
+        Record one rejected row.
+          - line_number: physical line in the source file (1 = header)
+          - raw_row: list of raw field values as read from the file
+          - reason: exception or message explaining the failure
+        """
+        if self._log is None:
+            self._log = open(self.log_path, 'a', encoding='utf-8', buffering=self.buffer_size)
+        self._log.write(f"Line {line_number}: Skipping row due to error: {reason}"
+                        f" | raw: {self.format_row(raw_row)}\n")
+        self.counts[self.reason_key(reason)] += 1
+
+        if self.quarantine_path:
+            if self._quarantine is None:
+                self._quarantine = open(self.quarantine_path, 'w', newline='',
+                                        encoding='utf-8', buffering=self.buffer_size)
+                self._quarantine_writer = csv.writer(self._quarantine)
+                self._quarantine_writer.writerow((self.header or []) + ['source_line', 'reject_reason'])
+            values = ['' if value is None else value for value in raw_row]
+            if self.header and len(values) < len(self.header):
+                values += [''] * (len(self.header) - len(values))
+            self._quarantine_writer.writerow(values + [line_number, str(reason)])
+
+    def summary_lines(self):
+        """
+        Return the per-reason count summary, most frequent reason first.
+        """
+        lines = [f"Rejected {self.total} row(s):"]
+        for reason, count in self.counts.most_common():
+            lines.append(f"  {count:>8} x {reason}")
+        return lines
+
+    def close(self):
+        """
+        Write the summary (if anything was rejected) and close open files.
+        """
+        if self._log is not None:
+            self._log.write("\n".join(self.summary_lines()) + "\n")
+            self._log.close()
+            self._log = None
+        if self._quarantine is not None:
+            self._quarantine.close()
+            self._quarantine = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
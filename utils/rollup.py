@@ -0,0 +1,193 @@
+from datetime import date
+
+from utils.transaction_table import TRANSACTION_TYPES
+
+# Levels of the cube, coarsest first
+LEVELS = ('year', 'quarter', 'month', 'week', 'day')
+
+
+def _week_of_day(day):
+    year, week, weekday = date.fromisoformat(day).isocalendar()
+    return f"{year:04d}-W{week:02d}"
+
+
+def _quarter_of_month(month):
+    return f"{month[:4]}-Q{(int(month[5:7]) - 1) // 3 + 1}"
+
+
+# (child level, parent level, parent period of a child period), in the
+# order the levels are rolled up: each parent is built from its children
+ROLLUPS = (
+    ('day', 'week', _week_of_day),                 # '2019-03-04' -> '2019-W10'
+    ('day', 'month', lambda day: day[:7]),         # '2019-03-04' -> '2019-03'
+    ('month', 'quarter', _quarter_of_month),       # '2019-03'    -> '2019-Q1'
+    ('quarter', 'year', lambda quarter: quarter[:4])  # '2019-Q1' -> '2019'
+)
+# Level that each level drills down into
+DRILL_DOWN = {parent: child for child, parent, parent_of in ROLLUPS}
+
+
+def level_of(period):
+    """
+    Return the level of a period written as '2019', '2019-Q1', '2019-03',
+    '2019-W10' or '2019-03-04', or None if it is none of those.
+    """
+    if len(period) == 4 and period.isdigit():
+        return 'year'
+    if len(period) == 7 and period[4:6] == '-Q':
+        return 'quarter'
+    if len(period) == 8 and period[4:6] == '-W':
+        return 'week'
+    if len(period) == 7 and period[4] == '-':
+        return 'month'
+    if len(period) == 10 and period[4] == '-' and period[7] == '-':
+        return 'day'
+    return None
+
+
+def _new_cell():
+    # One [row count, sum of amounts, sum of negative amounts] per type code
+    return [[0, 0, 0] for _ in TRANSACTION_TYPES]
+
+
+# -----------------------------------------------------
+# Day/week/month/quarter/year totals by type
+# -----------------------------------------------------
+class RollupCube:
+    """
+    Totals by transaction type for every day, week, month, quarter and year
+    that has transactions, so any period and its sub-periods can be
+    summarized without reading the rows.
+
+    `cells[level][period]` holds one [row count, sum of amounts, sum of the
+    negative amounts] per type code, in integer cents, and
+    `children[level][period]` the sub-periods it drills down into.
+
+    from_days() builds the daily leaves from the day buckets of an
+    Aggregates and rolls them up level by level (days into weeks and
+    months, months into quarters, quarters into years). add() and remove()
+    then patch the one cell per level that a changed transaction falls in.
+    """
+
+    def __init__(self):
+        self.cells = {level: {} for level in LEVELS}
+        self.children = {level: {} for level in DRILL_DOWN}
+        self._paths = {}
+
+    @classmethod
+    def from_days(cls, days):
+        """
+        Build the cube from Aggregates.days ({(date ordinal, type code):
+        [count, cents, negative]}).
+        """
+        cube = cls()
+        leaves = cube.cells['day']
+        for (ordinal, type_code), bucket in days.items():
+            period = date.fromordinal(ordinal).isoformat()
+            cell = leaves.get(period)
+            if cell is None:
+                cell = leaves[period] = _new_cell()
+            cell[type_code] = list(bucket)
+
+        for child_level, parent_level, parent_of in ROLLUPS:
+            parents = cube.cells[parent_level]
+            children = cube.children[parent_level]
+            for period, cell in cube.cells[child_level].items():
+                parent = parent_of(period)
+                target = parents.get(parent)
+                if target is None:
+                    target = parents[parent] = _new_cell()
+                    children[parent] = set()
+                children[parent].add(period)
+                for total, bucket in zip(target, cell):
+                    total[0] += bucket[0]
+                    total[1] += bucket[1]
+                    total[2] += bucket[2]
+        return cube
+
+    def _path(self, ordinal):
+        """
+        Return {level: period} of the day `ordinal`, computed once per day.
+        """
+        path = self._paths.get(ordinal)
+        if path is None:
+            path = {'day': date.fromordinal(ordinal).isoformat()}
+            for child_level, parent_level, parent_of in ROLLUPS:
+                path[parent_level] = parent_of(path[child_level])
+            self._paths[ordinal] = path
+        return path
+
+    def add(self, ordinal, type_code, cents):
+        """
+        Add one transaction to its cell at every level.
+        """
+        path = self._path(ordinal)
+        for level, period in path.items():
+            cell = self.cells[level].get(period)
+            if cell is None:
+                cell = self.cells[level][period] = _new_cell()
+                if level in self.children:
+                    self.children[level][period] = set()
+            bucket = cell[type_code]
+            bucket[0] += 1
+            bucket[1] += cents
+            if cents < 0:
+                bucket[2] += cents
+        for child_level, parent_level, parent_of in ROLLUPS:
+            self.children[parent_level][path[parent_level]].add(path[child_level])
+
+    def remove(self, ordinal, type_code, cents):
+        """
+        Take one transaction back out of its cell at every level, dropping
+        the periods left without transactions.
+        """
+        path = self._path(ordinal)
+        for level, period in path.items():
+            cell = self.cells[level][period]
+            bucket = cell[type_code]
+            bucket[0] -= 1
+            bucket[1] -= cents
+            if cents < 0:
+                bucket[2] -= cents
+            if not any(count for count, total, negative in cell):
+                del self.cells[level][period]
+                self.children.get(level, {}).pop(period, None)
+                for child_level, parent_level, parent_of in ROLLUPS:
+                    if child_level == level:
+                        self.children[parent_level][path[parent_level]].discard(period)
+
+    def __eq__(self, other):
+        return (isinstance(other, RollupCube) and self.cells == other.cells
+                and self.children == other.children)
+
+    def periods(self, level):
+        """
+        Return the periods of `level` that have transactions, oldest first.
+        """
+        return sorted(self.cells[level])
+
+    def totals(self, level, period):
+        """
+        Return {'credit': {...}, 'debit': {...}, 'transfer': {...}} for one
+        period, each with 'count', 'cents' and 'absolute' (every amount
+        counted as positive), or None if the period has no transactions.
+        """
+        cell = self.cells[level].get(period)
+        if cell is None:
+            return None
+        return {
+            TRANSACTION_TYPES[type_code]: {'count': count, 'cents': cents, 'absolute': cents - 2 * negative}
+            for type_code, (count, cents, negative) in enumerate(cell)
+        }
+
+    def drill(self, level, period):
+        """
+        Return [(sub-period, totals)] for the sub-periods of `period`
+        (a year's quarters, a quarter's months, a month's or week's days),
+        oldest first, or None if the period has no transactions.
+        """
+        children = self.children[level].get(period)
+        if children is None:
+            return None
+        child_level = DRILL_DOWN[level]
+        return [(child, self.totals(child_level, child)) for child in sorted(children)]
@@ -0,0 +1,151 @@
+from array import array
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+from utils.transaction_table import TransactionTable
+
+# -----------------------------------------------------
+# Binary snapshot layout
+# -----------------------------------------------------
+# Header: magic, byte order, CSV size, CSV mtime (ns), CSV SHA-256,
+#         row count, pool size, pool text length (characters)
+# Body:   the six TransactionTable columns as raw array bytes,
+#         pool offsets as array('q') (pool size + 1 character offsets),
+#         the whole description pool as one UTF-8 blob
+MAGIC = b'SFASNAP1'
+HEADER = struct.Struct('<8sBQq32sQQQ')
+BYTE_ORDER = 0 if sys.byteorder == 'little' else 1
+COLUMN_TYPECODES = ('q', 'i', 'q', 'q', 'b', 'i')
+HASH_BLOCK_BYTES = 1 << 20
+
+
+def snapshot_path(filename):
+    """
+    Return the sidecar snapshot path for a CSV file.
+    """
+    return filename + '.snapshot'
+
+
+def file_digest(filename):
+    """
+    Return the SHA-256 digest of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+def file_key(filename):
+    """
+    Return the (size, mtime_ns, sha256) key identifying a CSV's contents.
+    """
+    stat = os.stat(filename)
+    return stat.st_size, stat.st_mtime_ns, file_digest(filename)
+
+
+# -----------------------------------------------------
+# WRITE a snapshot of a freshly parsed table
+# -----------------------------------------------------
+def save_snapshot(filename, transactions, key):
+    """
+    Write the sidecar snapshot for `filename`, tagged with the key the CSV
+    had when it was parsed. The snapshot is written to a temporary file and
+    renamed into place, so a crash never leaves a half-written snapshot.
+    Returns True on success; failures are reported but never fatal.
+    """
+    path = snapshot_path(filename)
+    tmp_path = path + '.tmp'
+    size, mtime_ns, digest = key
+    strings = transactions.strings
+    offsets = array('q', [0])
+    for text in strings:
+        offsets.append(offsets[-1] + len(text))
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, BYTE_ORDER, size, mtime_ns, digest,
+                                len(transactions), len(strings), offsets[-1]))
+            for name in TransactionTable.COLUMNS:
+                getattr(transactions, name).tofile(f)
+            offsets.tofile(f)
+            f.write(''.join(strings).encode('utf-8'))
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"⚠️ Could not write snapshot {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+# -----------------------------------------------------
+# READ a snapshot if it still matches the CSV
+# -----------------------------------------------------
+def _read_header(buffer):
+    if len(buffer) < HEADER.size:
+        return None
+    fields = HEADER.unpack_from(buffer, 0)
+    if fields[0] != MAGIC or fields[1] != BYTE_ORDER:
+        return None
+    return fields[2:]
+
+
+def _read_array(buffer, pos, typecode, count):
+    """
+    Copy `count` items of an array out of the mapped buffer.
+    Returns (array, next position); raises ValueError if truncated.
+    """
+    column = array(typecode)
+    end = pos + count * column.itemsize
+    if end > len(buffer):
+        raise ValueError("truncated snapshot")
+    column.frombytes(buffer[pos:end])
+    return column, end
+
+
+def load_snapshot(filename):
+    """
+    Return a TransactionTable from the sidecar snapshot of `filename`, or
+    None if there is no usable snapshot.
+
+    The snapshot is used when the CSV's size and mtime match the stored key.
+    If only the mtime differs (e.g. the file was touched or copied), the
+    content hash decides, and a matching hash refreshes the stored mtime.
+    Corrupt or truncated snapshots are ignored so the caller rebuilds them.
+    """
+    path = snapshot_path(filename)
+    try:
+        stat = os.stat(filename)
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                header = _read_header(buffer)
+                if header is None:
+                    return None
+                size, mtime_ns, digest, rows, pool_size, pool_chars = header
+                if size != stat.st_size:
+                    return None
+                touched = mtime_ns != stat.st_mtime_ns
+                if touched and file_digest(filename) != digest:
+                    return None
+
+                pos = HEADER.size
+                columns = []
+                for typecode in COLUMN_TYPECODES:
+                    column, pos = _read_array(buffer, pos, typecode, rows)
+                    columns.append(column)
+                offsets, pos = _read_array(buffer, pos, 'q', pool_size + 1)
+                text = buffer[pos:].decode('utf-8')
+                if len(text) != pool_chars:
+                    return None
+                strings = [text[offsets[i]:offsets[i + 1]] for i in range(pool_size)]
+    except (OSError, ValueError, struct.error):
+        return None
+
+    transactions = TransactionTable.from_columns(columns, strings)
+    if touched:
+        save_snapshot(filename, transactions, (stat.st_size, stat.st_mtime_ns, digest))
+    return transactions
@@ -0,0 +1,320 @@
+from datetime import datetime
+import itertools
+import os
+import sqlite3
+
+from utils.analysis import load_transactions, save_transactions
+from utils.partitioned import PartitionedStorage
+from utils.record_file import RecordFile, export_records, import_records
+from utils.transaction_table import TransactionTable, TRANSACTION_TYPES, TYPE_CODES, to_cents
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+RECORD_EXTENSION = '.rec'
+# Rows passed to each executemany() call
+BATCH_ROWS = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    transaction_id INTEGER NOT NULL,
+    date           TEXT    NOT NULL,
+    customer_id    INTEGER NOT NULL,
+    amount_cents   INTEGER NOT NULL,
+    type           TEXT    NOT NULL CHECK (type IN ('credit', 'debit', 'transfer')),
+    description    TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_id ON transactions (transaction_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_customer ON transactions (customer_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions (type);
+"""
+COLUMNS = 'transaction_id, date, customer_id, amount_cents, type, description'
+
+
+# -----------------------------------------------------
+# CSV storage (the original format)
+# -----------------------------------------------------
+class CSVStorage:
+    """
+    Keep transactions in a CSV file (optionally .gz/.bz2/.xz compressed),
+    through load_transactions() and save_transactions().
+    Queries always run on the in-memory table.
+    """
+
+    def __init__(self, filename='data/financial_transactions.csv'):
+        self.filename = filename
+
+    def load(self):
+        return load_transactions(self.filename)
+
+    def save(self, transactions):
+        save_transactions(transactions, self.filename)
+
+    def can_query(self, transactions):
+        return False
+
+
+# -----------------------------------------------------
+# SQLite storage
+# -----------------------------------------------------
+class SQLiteStorage:
+    """
+    Keep transactions in a SQLite database (stdlib sqlite3).
+
+    Rows live in one `transactions` table, in insertion order (rowid), with
+    amounts stored as integer cents and dates as 'YYYY-MM-DD' text. There
+    are indexes on transaction_id, date, customer_id and type.
+
+    save() writes in a single SQL transaction with batched executemany()
+    calls; like save_transactions() it only inserts the new rows when the
+    table was loaded from (or saved to) the unchanged database and no
+    existing rows were modified or deleted.
+
+    While the in-memory table matches the database (see can_query()),
+    find_transaction(), filter_by_year() and monthly_summary() run as SQL
+    queries using the indexes instead of scanning the table.
+    """
+
+    def __init__(self, filename='data/financial_transactions.db'):
+        self.filename = filename
+
+    def connect(self):
+        connection = sqlite3.connect(self.filename)
+        connection.executescript(SCHEMA)
+        return connection
+
+    def load(self):
+        """
+        Load every row into a TransactionTable.
+        """
+        if not os.path.exists(self.filename):
+            print(f"❌ File not found: {self.filename}")
+            return TransactionTable()
+        try:
+            connection = self.connect()
+            try:
+                rows = connection.execute(f"SELECT {COLUMNS} FROM transactions ORDER BY rowid")
+                transactions = TransactionTable()
+                ordinals = {}
+                intern = transactions.pool.intern
+                for transaction_id, date_text, customer_id, cents, t_type, description in rows:
+                    ordinal = ordinals.get(date_text)
+                    if ordinal is None:
+                        ordinal = ordinals[date_text] = datetime.strptime(date_text, '%Y-%m-%d').toordinal()
+                    transactions.ids.append(transaction_id)
+                    transactions.dates.append(ordinal)
+                    transactions.customers.append(customer_id)
+                    transactions.cents.append(cents)
+                    transactions.types.append(TYPE_CODES[t_type])
+                    transactions.descriptions.append(intern(description))
+            finally:
+                connection.close()
+            transactions.mark_clean(self.filename)
+            print(f"✅ {len(transactions)} transactions successfully loaded from {self.filename}")
+            return transactions
+
+        except Exception as e:
+            print(f"❌ Error loading transactions: {e}")
+            return TransactionTable()
+
+    def save(self, transactions):
+        """
+        Write the transactions to the database in one SQL transaction.
+        """
+        tracked = isinstance(transactions, TransactionTable)
+        try:
+            appendable = (tracked and os.path.exists(self.filename)
+                          and transactions.can_append_to(self.filename))
+            if appendable and not transactions.appended_rows:
+                print(f"💾 No changes to save to {self.filename}")
+                return
+
+            os.makedirs(os.path.dirname(self.filename) or '.', exist_ok=True)
+            connection = self.connect()
+            try:
+                with connection:
+                    start = transactions.persisted_rows if appendable else 0
+                    if not appendable:
+                        connection.execute("DELETE FROM transactions")
+                    rows = _sql_rows(transactions, start)
+                    count = 0
+                    while True:
+                        batch = list(itertools.islice(rows, BATCH_ROWS))
+                        if not batch:
+                            break
+                        connection.executemany(
+                            f"INSERT INTO transactions ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)", batch)
+                        count += len(batch)
+            finally:
+                connection.close()
+
+            if appendable:
+                print(f"💾 {count} new transactions appended to {self.filename}")
+            else:
+                print(f"💾 Transactions saved to {self.filename}")
+            if tracked:
+                transactions.mark_clean(self.filename)
+
+        except Exception as e:
+            print(f"❌ Error saving transactions: {e}")
+
+    def can_query(self, transactions):
+        """
+        True if the database holds exactly the rows of `transactions`, so
+        queries can run in SQL instead of on the table.
+        """
+        return (isinstance(transactions, TransactionTable) and not transactions.has_changes()
+                and transactions.can_append_to(self.filename))
+
+    def _query(self, sql, parameters=()):
+        connection = self.connect()
+        try:
+            return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def find_transaction(self, transaction_id):
+        """
+        Return the first transaction with this ID as a dictionary, or None.
+        """
+        rows = self._query(f"SELECT {COLUMNS} FROM transactions WHERE transaction_id = ? "
+                           "ORDER BY rowid LIMIT 1", (transaction_id,))
+        return _to_dict(rows[0]) if rows else None
+
+    def filter_by_year(self, year):
+        """
+        Return the transactions dated in `year` as dictionaries, in order.
+        """
+        rows = self._query(f"SELECT {COLUMNS} FROM transactions WHERE date >= ? AND date < ? "
+                           "ORDER BY rowid", (f"{year:04d}-01-01", f"{year + 1:04d}-01-01"))
+        return [_to_dict(row) for row in rows]
+
+    def monthly_summary(self):
+        """
+        Return {'YYYY-MM': {'credit': cents, 'debit': cents}} like
+        monthly_totals(), or None if there are no transactions.
+        """
+        if not self._query("SELECT 1 FROM transactions LIMIT 1"):
+            return None
+        # Credits keep their sign; debits count as positive expenses
+        rows = self._query("SELECT substr(date, 1, 7), type, "
+                           "SUM(CASE WHEN type = 'debit' THEN ABS(amount_cents) ELSE amount_cents END) "
+                           "FROM transactions WHERE type IN ('credit', 'debit') GROUP BY 1, 2")
+        summary = {}
+        for month, t_type, cents in rows:
+            summary.setdefault(month, {'credit': 0, 'debit': 0})[t_type] = cents
+        return summary
+
+
+# -----------------------------------------------------
+# Fixed-width binary record storage
+# -----------------------------------------------------
+class RecordStorage:
+    """
+    Keep transactions in a fixed-width binary record file with a
+    description heap (see utils.record_file). Saving rewrites the file;
+    find_transaction() binary-searches the memory-mapped file without
+    loading it.
+    """
+
+    def __init__(self, filename='data/financial_transactions.rec'):
+        self.filename = filename
+
+    def load(self):
+        try:
+            transactions = import_records(self.filename)
+            transactions.mark_clean(self.filename)
+            print(f"✅ {len(transactions)} transactions successfully loaded from {self.filename}")
+            return transactions
+        except FileNotFoundError:
+            print(f"❌ File not found: {self.filename}")
+            return TransactionTable()
+        except Exception as e:
+            print(f"❌ Error loading transactions: {e}")
+            return TransactionTable()
+
+    def save(self, transactions):
+        try:
+            export_records(transactions, self.filename)
+            if isinstance(transactions, TransactionTable):
+                transactions.mark_clean(self.filename)
+            print(f"💾 Transactions saved to {self.filename}")
+        except Exception as e:
+            print(f"❌ Error saving transactions: {e}")
+
+    def can_query(self, transactions):
+        return False
+
+    def find_transaction(self, transaction_id):
+        """
+        Return the first transaction with this ID as a dictionary, or None.
+        """
+        with RecordFile(self.filename) as records:
+            return records.find(transaction_id)
+
+
+def _sql_rows(transactions, start):
+    """
+    Yield parameter tuples for INSERT, straight from the table's columns
+    when possible.
+    """
+    if isinstance(transactions, TransactionTable):
+        date_text = {}
+        for i in range(start, len(transactions)):
+            ordinal = transactions.dates[i]
+            day = date_text.get(ordinal)
+            if day is None:
+                day = date_text[ordinal] = datetime.fromordinal(ordinal).strftime('%Y-%m-%d')
+            yield (transactions.ids[i], day, transactions.customers[i], transactions.cents[i],
+                   TRANSACTION_TYPES[transactions.types[i]], transactions.get_value(i, 'description'))
+    else:
+        for t in itertools.islice(transactions, start, None):
+            yield (t['transaction_id'], t['date'].strftime('%Y-%m-%d'), t['customer_id'],
+                   to_cents(t['amount']), t['type'], t['description'])
+
+
+def _to_dict(row):
+    transaction_id, date_text, customer_id, cents, t_type, description = row
+    return {
+        'transaction_id': transaction_id,
+        'date': datetime.strptime(date_text, '%Y-%m-%d'),
+        'customer_id': customer_id,
+        'amount': cents / 100,
+        'type': t_type,
+        'description': description
+    }
+
+
+# -----------------------------------------------------
+# Pick a storage backend from the file name
+# -----------------------------------------------------
+def open_storage(filename='data/financial_transactions.csv'):
+    """
+    Return SQLiteStorage for .db/.sqlite/.sqlite3 files, PartitionedStorage
+    for a directory (or a path ending in '/'), RecordStorage for .rec
+    files, CSVStorage otherwise.
+    """
+    if os.path.isdir(filename) or filename.endswith(('/', os.sep)):
+        return PartitionedStorage(filename)
+    if filename.lower().endswith(SQLITE_EXTENSIONS):
+        return SQLiteStorage(filename)
+    if filename.lower().endswith(RECORD_EXTENSION):
+        return RecordStorage(filename)
+    return CSVStorage(filename)
+
+
+# -----------------------------------------------------
+# IMPORT / EXPORT between storage formats
+# -----------------------------------------------------
+def convert_storage(source, target):
+    """
+    Copy all transactions from one file to another, each in the format
+    its name implies, e.g. convert_storage('data/financial_transactions.csv',
+    'data/financial_transactions.db') imports a CSV into SQLite.
+    Returns the number of transactions copied.
+    """
+    if not os.path.exists(source):
+        print(f"❌ File not found: {source}")
+        return 0
+    transactions = open_storage(source).load()
+    open_storage(target).save(transactions)
+    return len(transactions)
@@ -0,0 +1,67 @@
+from collections import Counter
+import sys
+
+# -----------------------------------------------------
+# Shared pool of deduplicated strings
+# -----------------------------------------------------
+class StringPool:
+    """
+    Store each distinct string once and refer to it by a small integer id.
+
+    Bank exports repeat the same merchant descriptions across many rows, so
+    rows keep an id into the pool instead of their own copy of the text.
+    """
+
+    def __init__(self, strings=()):
+        self.strings = []
+        self._ids = {}
+        for text in strings:
+            self.intern(text)
+
+    def intern(self, text):
+        """
+        Return the id of `text`, adding it to the pool if it is new.
+        """
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(text)
+            self._ids[text] = string_id
+        return string_id
+
+    def __getitem__(self, string_id):
+        return self.strings[string_id]
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __iter__(self):
+        return iter(self.strings)
+
+    def memory_usage(self):
+        """
+        Return the approximate number of bytes held by the pool.
+        """
+        return (sys.getsizeof(self.strings) + sys.getsizeof(self._ids)
+                + sum(sys.getsizeof(text) for text in self.strings))
+
+    def usage(self, ids):
+        """
+        Report how well the pool deduplicates the strings referenced by `ids`
+        (e.g. a table's description column). Returns a dictionary with:
+          - total: number of references
+          - unique: number of distinct strings referenced
+          - ratio: unique / total
+          - bytes_saved: bytes a separate string per reference would have
+            cost, minus the bytes of the shared copies
+        """
+        counts = Counter(ids)
+        total = sum(counts.values())
+        bytes_saved = sum((count - 1) * sys.getsizeof(self.strings[string_id])
+                          for string_id, count in counts.items())
+        return {
+            'total': total,
+            'unique': len(counts),
+            'ratio': len(counts) / total if total else 0.0,
+            'bytes_saved': bytes_saved
+        }
@@ -1,5 +1,9 @@
 from datetime import datetime
+import os
 from utils.analysis import load_transactions
+from utils.backups import list_backups, restore_backup
+from utils.storage import convert_storage
+from utils.transaction_table import TransactionTable, parse_cents
 
 
 # -----------------------------------------------------
@@ -16,8 +20,15 @@ def add_transaction(transactions):
     """
     print("\n--- Add New Transaction ---")
     try:
-        # Determine the next transaction ID
-        transaction_id = max([t['transaction_id'] for t in transactions], default=0) + 1
+        # Determine the next transaction ID and customer ID, straight from
+        # the columns of a TransactionTable instead of building a row view each
+        if isinstance(transactions, TransactionTable):
+            last_id = max(transactions.ids, default=0)
+            last_customer_id = max(transactions.customers, default=0)
+        else:
+            last_id = max((t['transaction_id'] for t in transactions), default=0)
+            last_customer_id = max((t['customer_id'] for t in transactions), default=0)
+        transaction_id = last_id + 1
         print(f"ℹ️ Using next transaction ID: {transaction_id}")
 
         # Prompt for date with default to today
@@ -29,8 +40,7 @@ def add_transaction(transactions):
             date = datetime.strptime(date_str, "%Y-%m-%d")
 
         # Prompt for customer ID with default to next available
-        customer_ids = [t['customer_id'] for t in transactions]
-        next_customer_id = max(customer_ids, default=0) + 1
+        next_customer_id = last_customer_id + 1
         cust_input = input(f"Enter customer ID [Press Enter for next ID: {next_customer_id}]: ").strip()
         if not cust_input:
             customer_id = next_customer_id
@@ -38,8 +48,8 @@ def add_transaction(transactions):
         else:
             customer_id = int(cust_input)
 
-        # Prompt for amount and validate it
-        amount = float(input("Enter amount: "))
+        # Prompt for amount and validate it, parsed to exact cents like the loader does
+        amount = parse_cents(input("Enter amount: "))
         if amount < 0:
             print("⚠️ Amount should be positive. It will be adjusted if it's a debit.")
             amount = abs(amount)
@@ -65,7 +75,7 @@ def add_transaction(transactions):
             'transaction_id': transaction_id,
             'date': date,
             'customer_id': customer_id,
-            'amount': amount,
+            'amount': amount / 100,
             'type': trans_type,
             'description': description
         }
@@ -110,10 +120,11 @@ def view_transactions(transactions):
 # -----------------------------------------------------
 def view_transactions_from_file():
     """
-    Load and display transactions directly from the saved CSV file.
+    Load and display transactions directly from the saved CSV file
+    (without replaying unsaved edits from the journal).
     """
     try:
-        file_transactions = load_transactions()
+        file_transactions = load_transactions(journal=False)
 
         if not file_transactions:
             print("\nThe transaction file is empty or invalid.")
@@ -161,7 +172,7 @@ def update_transaction(transactions):
 
                 new_amount = input(f"Amount ({t['amount']}): ").strip()
                 if new_amount:
-                    t['amount'] = float(new_amount)
+                    t['amount'] = parse_cents(new_amount) / 100
 
                 new_type = input(f"Type ({t['type']}): ").strip().lower()
                 if new_type:
@@ -218,10 +229,12 @@ def delete_transaction(transactions):
 # -----------------------------------------------------
 # Option 10. Filter Transactions by Year
 # -----------------------------------------------------
-def filter_transactions_by_year(transactions):
+def filter_transactions_by_year(transactions, storage=None):
     """
     Prompt the user to enter a year and filter transactions for that year.
     Display the filtered transactions in a table format.
+    If a storage backend can answer the query for these transactions (see
+    SQLiteStorage.can_query()), the filter runs there instead.
     """
     if not transactions:
         print("⚠️ No transactions available to filter.")
@@ -234,7 +247,10 @@ def filter_transactions_by_year(transactions):
             return
 
         year = int(year_input)
-        filtered = [t for t in transactions if t['date'].year == year]
+        if storage is not None and storage.can_query(transactions):
+            filtered = storage.filter_by_year(year)
+        else:
+            filtered = [t for t in transactions if t['date'].year == year]
 
         if not filtered:
             print(f"📭 No transactions found for the year {year}.")
@@ -258,3 +274,51 @@ def filter_transactions_by_year(transactions):
 
     except Exception as e:
         print(f"❌ Error filtering by year: {e}")
+
+# -----------------------------------------------------
+# Option 13. RESTORE the CSV file from a backup version
+# -----------------------------------------------------
+def restore_transactions_backup(filename='data/financial_transactions.csv'):
+    """
+    List the newest backup versions of the CSV file and restore the one
+    the user picks (Enter restores the newest).
+    Returns True if the file was restored.
+    """
+    versions = list_backups(filename)[:10]
+    if not versions:
+        print("⚠️ No backups available to restore.")
+        return False
+
+    print("\n--- Available Backups ---\n")
+    for number, manifest in enumerate(versions, start=1):
+        print(f"{number:>2}. {manifest['created'].replace('T', ' ')}  {manifest['size']:>12,} bytes")
+
+    choice = input("\nBackup to restore [Press Enter for the newest]: ").strip()
+    if not choice:
+        return restore_backup(versions[0]['id'], filename)
+    if not choice.isdigit() or not 1 <= int(choice) <= len(versions):
+        print("❌ Invalid backup number.")
+        return False
+    return restore_backup(versions[int(choice) - 1]['id'], filename)
+
+# -----------------------------------------------------
+# Option 14. IMPORT / EXPORT between CSV and SQLite
+# -----------------------------------------------------
+def import_export_transactions():
+    """
+    Prompt for a source and a destination file and copy all transactions
+    between them; the format of each (CSV or SQLite) follows its extension.
+    """
+    print("\n--- Import / Export ---")
+    print("Formats: .csv (optionally .gz/.bz2/.xz), .db/.sqlite for SQLite, .rec for binary records,")
+    print("         or a directory for one CSV per year")
+    source = input("Source file [data/financial_transactions.csv]: ").strip()
+    source = source or 'data/financial_transactions.csv'
+    target = input("Destination file [data/financial_transactions.db]: ").strip()
+    target = target or 'data/financial_transactions.db'
+    if os.path.abspath(source) == os.path.abspath(target):
+        print("❌ Source and destination must be different files.")
+        return
+    count = convert_storage(source, target)
+    if count:
+        print(f"✅ Copied {count} transactions from {source} to {target}")
@@ -0,0 +1,431 @@
+from array import array
+from collections.abc import Mapping
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_EVEN
+import math
+import os
+
+from utils.string_pool import StringPool
+
+# -----------------------------------------------------
+# Column layout shared by every transaction in the table
+# -----------------------------------------------------
+FIELDNAMES = ('transaction_id', 'date', 'customer_id', 'amount', 'type', 'description')
+TRANSACTION_TYPES = ('credit', 'debit', 'transfer')
+TYPE_CODES = {name: code for code, name in enumerate(TRANSACTION_TYPES)}
+
+
+def to_cents(amount):
+    """
+    Convert a dollar amount (float or int) to an integer number of cents.
+    """
+    return int(round(amount * 100))
+
+
+def parse_cents(text):
+    """
+    Convert an amount as written in the CSV (str or bytes, e.g. '12.5',
+    '-0.07') straight to an integer number of cents, without going through
+    a float. Anything other than plain digits with at most two decimals
+    (exponents, more decimals, ...) is parsed with Decimal and rounded
+    half to even; invalid text raises ValueError like float() does.
+    """
+    dot = b'.' if isinstance(text, bytes) else '.'
+    whole, _, fraction = text.partition(dot)
+    if len(fraction) == 2 and fraction.isdigit():
+        # The usual '1234.56': the digits without the dot are the cents
+        try:
+            return int(whole + fraction)
+        except ValueError:
+            pass
+    whole, _, fraction = text.strip().partition(dot)
+    negative = whole[:1] in ('-', b'-')
+    digits = whole[1:] if whole[:1] in ('-', '+', b'-', b'+') else whole
+    if ((digits.isascii() and digits.isdigit() or (not digits and fraction))
+            and len(fraction) <= 2 and (not fraction or fraction.isascii() and fraction.isdigit())):
+        cents = int(digits or 0) * 100 + (int(fraction) * 10 if len(fraction) == 1 else int(fraction or 0))
+        return -cents if negative else cents
+    if isinstance(text, bytes):
+        text = text.decode('utf-8')
+    # float() validates the text and raises its usual error message
+    if not math.isfinite(float(text)):
+        raise ValueError(f"Amount is not a finite number: {text.strip()}")
+    return int(Decimal(text.strip()).scaleb(2).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def format_cents(cents, grouping=False):
+    """
+    Format integer cents as dollars with two decimals, e.g. -123456 ->
+    '-1234.56' (or '-1,234.56' with grouping=True), exactly.
+    """
+    sign = '-' if cents < 0 else ''
+    dollars, remainder = divmod(abs(cents), 100)
+    return f"{sign}{dollars:,}.{remainder:02d}" if grouping else f"{sign}{dollars}.{remainder:02d}"
+
+
+# -----------------------------------------------------
+# Lightweight view over one row of a TransactionTable
+# -----------------------------------------------------
+class TransactionRow(Mapping):
+    """
+    A dictionary-like view of a single row stored in a TransactionTable.
+
+    Reading t['date'], t['amount'], ... decodes the value from the table's
+    columns, and assigning t['amount'] = 10.0 writes straight back into them,
+    so the CRUD helpers can keep treating transactions like dictionaries.
+    A view points at a position, so it should not be kept across deletions.
+    """
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._table.get_value(self._index, key)
+
+    def __setitem__(self, key, value):
+        self._table.set_value(self._index, key, value)
+
+    def __iter__(self):
+        return iter(FIELDNAMES)
+
+    def __len__(self):
+        return len(FIELDNAMES)
+
+    def __repr__(self):
+        return f"TransactionRow({dict(self)!r})"
+
+
+# -----------------------------------------------------
+# Columnar, array-backed store of transactions
+# -----------------------------------------------------
+class TransactionTable:
+    """
+    Store transactions as typed columns instead of a list of dictionaries.
+
+    Columns:
+      - ids:          array('q') of transaction IDs
+      - dates:        array('i') of date ordinals (datetime.toordinal())
+      - customers:    array('q') of customer IDs
+      - cents:        array('q') of amounts in integer cents
+      - types:        array('b') of codes into TRANSACTION_TYPES
+      - descriptions: array('i') of ids into `pool`, a shared StringPool
+                      (negative ids are reserved for subclasses that keep
+                      the text elsewhere, e.g. MappedTransactionTable)
+
+    Each row costs 33 bytes of column storage plus its share of the
+    description pool. Measured with tracemalloc on generated data
+    (1,000 distinct descriptions repeated across all rows):
+      - 1M rows:  ~32 MB for the table vs ~480 MB as a list of dicts
+      - 10M rows: ~315 MB for the table vs ~4.8 GB as a list of dicts
+
+    The table behaves like a list of transactions: len(), iteration,
+    indexing, del table[i] and append() all work, and rows come back as
+    TransactionRow views that read and write like dictionaries.
+
+    The table also tracks changes since it was last loaded from or saved
+    to a file (see mark_clean()): rows appended after the persisted ones,
+    and the IDs of persisted rows that were modified or deleted (plus the
+    dates those rows had before and after the change, in touched_dates).
+    This lets save_transactions() append new rows instead of rewriting the
+    file, and PartitionedStorage rewrite only the affected partitions.
+    A table from a date-range PartitionedStorage.load() also carries
+    `partition_scope`: the partitions it holds (see that class).
+
+    If `journal` is set (see utils.journal), every append, field update and
+    deletion is also written to it as it happens.
+
+    If `aggregates` is set (see utils.aggregates), every append, update and
+    deletion adjusts it too, so the totals stay current without rescanning.
+    `version` goes up with every append, update and deletion, so other
+    results computed from the rows can be cached until the data changes.
+    """
+
+    COLUMNS = ('ids', 'dates', 'customers', 'cents', 'types', 'descriptions')
+
+    def __init__(self, transactions=()):
+        self.ids = array('q')
+        self.dates = array('i')
+        self.customers = array('q')
+        self.cents = array('q')
+        self.types = array('b')
+        self.descriptions = array('i')
+        self.pool = StringPool()
+        self.persisted_rows = 0
+        self.modified_ids = set()
+        self.deleted_ids = set()
+        self.touched_dates = set()
+        self.source = None
+        self.partition_scope = None
+        self.journal = None
+        self.version = 0
+        self.aggregates = None
+        for transaction in transactions:
+            self.append(transaction)
+
+    @classmethod
+    def from_columns(cls, columns, strings):
+        """
+        Build a table directly from column arrays (in COLUMNS order) and a
+        description pool, without any per-row work.
+        """
+        table = cls()
+        for name, column in zip(cls.COLUMNS, columns):
+            setattr(table, name, column)
+        table.pool = StringPool(strings)
+        return table
+
+    # -------------------------------------------------
+    # Dirty tracking
+    # -------------------------------------------------
+    def mark_clean(self, filename):
+        """
+        Record that every row now matches `filename` on disk, e.g. right
+        after loading from or saving to it.
+        """
+        stat = os.stat(filename)
+        self.persisted_rows = len(self)
+        self.modified_ids.clear()
+        self.deleted_ids.clear()
+        self.touched_dates.clear()
+        self.source = (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns)
+
+    def mark_saving(self):
+        """
+        Record that every current row is being written by a background save.
+        The file's new size and mtime are unknown until it finishes, so the
+        source is cleared; BackgroundSaver sets it again on success.
+        """
+        self.persisted_rows = len(self)
+        self.modified_ids.clear()
+        self.deleted_ids.clear()
+        self.touched_dates.clear()
+        self.source = None
+
+    @property
+    def appended_rows(self):
+        """
+        Number of rows added after the persisted ones.
+        """
+        return len(self) - self.persisted_rows
+
+    def has_changes(self):
+        return bool(self.appended_rows or self.modified_ids or self.deleted_ids)
+
+    def loaded_from(self, filename):
+        """
+        True if `filename` is the unchanged file this table was last loaded
+        from or saved to.
+        """
+        if self.source is None:
+            return False
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return False
+        return self.source == (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns)
+
+    def can_append_to(self, filename):
+        """
+        True if `filename` is the unchanged file this table was last loaded
+        from or saved to, and its persisted rows were neither modified nor
+        deleted, so saving only needs to append the new rows.
+        """
+        if self.modified_ids or self.deleted_ids:
+            return False
+        return self.loaded_from(filename)
+
+    @property
+    def strings(self):
+        """
+        The description pool, indexed by the ids in the `descriptions` column.
+        """
+        return self.pool.strings
+
+    def description_stats(self):
+        """
+        Report how well descriptions are deduplicated: total rows, unique
+        descriptions, unique-to-total ratio and bytes saved by sharing.
+        """
+        return self.pool.usage(i for i in self.descriptions if i >= 0)
+
+    def compact_pool(self):
+        """
+        Rebuild the pool with only the descriptions rows still refer to,
+        dropping text left behind by updates and deletions.
+        """
+        old_pool, pool = self.pool, StringPool()
+        self.descriptions = array('i', (pool.intern(old_pool[i]) if i >= 0 else i
+                                        for i in self.descriptions))
+        self.pool = pool
+
+    def append(self, transaction):
+        """
+        Add a transaction dictionary (or row view) to the end of the table.
+        Raises ValueError if the transaction type is unknown.
+        """
+        t_type = transaction['type']
+        if t_type not in TYPE_CODES:
+            raise ValueError(f"Invalid transaction type: {t_type}")
+
+        self.ids.append(transaction['transaction_id'])
+        self.dates.append(transaction['date'].toordinal())
+        self.customers.append(transaction['customer_id'])
+        self.cents.append(to_cents(transaction['amount']))
+        self.types.append(TYPE_CODES[t_type])
+        self.descriptions.append(self.pool.intern(transaction['description']))
+        self.version += 1
+        if self.aggregates is not None:
+            self.aggregates.add(self.dates[-1], self.types[-1], self.cents[-1])
+        if self.journal is not None:
+            self.journal.record_append(transaction)
+
+    def extend(self, transactions):
+        """
+        Append every transaction from an iterable of dictionaries or rows.
+        """
+        for transaction in transactions:
+            self.append(transaction)
+
+    def extend_table(self, other):
+        """
+        Append every row of another TransactionTable column by column,
+        remapping its description ids into this table's string pool.
+        """
+        remap = [self.pool.intern(text) for text in other.pool]
+        self.ids.extend(other.ids)
+        self.dates.extend(other.dates)
+        self.customers.extend(other.customers)
+        self.cents.extend(other.cents)
+        self.types.extend(other.types)
+        self.descriptions.extend(array('i', (remap[i] for i in other.descriptions)))
+        self.version += 1
+        if self.aggregates is not None:
+            self.aggregates.add_columns(other.dates, other.types, other.cents)
+
+    def take(self, indexes):
+        """
+        Return a new table holding only the rows at the given positions.
+        The new table shares a copy of this table's description pool.
+        """
+        indexes = list(indexes)
+        columns = [array(getattr(self, name).typecode, (getattr(self, name)[i] for i in indexes))
+                   for name in self.COLUMNS]
+        return TransactionTable.from_columns(columns, self.pool.strings)
+
+    def copy(self):
+        """
+        Return a point-in-time copy of the rows, e.g. for a background save.
+        The columns are copied with one memcpy each; the description pool is
+        shared, which is safe because the pool is only ever appended to
+        (compact_pool() swaps in a new pool instead of changing this one).
+        """
+        table = TransactionTable()
+        for name in self.COLUMNS:
+            setattr(table, name, getattr(self, name)[:])
+        table.pool = self.pool
+        return table
+
+    def get_value(self, index, key):
+        """
+        Decode a single field of the row at the given position.
+        """
+        if key == 'transaction_id':
+            return self.ids[index]
+        if key == 'date':
+            return datetime.fromordinal(self.dates[index])
+        if key == 'customer_id':
+            return self.customers[index]
+        if key == 'amount':
+            return self.cents[index] / 100
+        if key == 'type':
+            return TRANSACTION_TYPES[self.types[index]]
+        if key == 'description':
+            return self.pool[self.descriptions[index]]
+        raise KeyError(key)
+
+    def set_value(self, index, key, value):
+        """
+        Encode and store a single field of the row at the given position.
+        """
+        if index < 0:
+            index += len(self)
+        old_id = self.ids[index]
+        old_date = self.dates[index]
+        old_type = self.types[index]
+        old_cents = self.cents[index]
+        if key == 'transaction_id':
+            self.ids[index] = value
+        elif key == 'date':
+            self.dates[index] = value.toordinal()
+        elif key == 'customer_id':
+            self.customers[index] = value
+        elif key == 'amount':
+            self.cents[index] = to_cents(value)
+        elif key == 'type':
+            if value not in TYPE_CODES:
+                raise ValueError(f"Invalid transaction type: {value}")
+            self.types[index] = TYPE_CODES[value]
+        elif key == 'description':
+            self.descriptions[index] = self.pool.intern(value)
+        else:
+            raise KeyError(key)
+        self.version += 1
+        if self.aggregates is not None and key in ('date', 'amount', 'type'):
+            # Move the row out of its old bucket and into its new one
+            self.aggregates.remove(old_date, old_type, old_cents)
+            self.aggregates.add(self.dates[index], self.types[index], self.cents[index])
+        if index < self.persisted_rows:
+            self.modified_ids.add(old_id)
+            self.touched_dates.add(old_date)
+            self.touched_dates.add(self.dates[index])
+        if self.journal is not None:
+            self.journal.record_update(index, key, value)
+
+    def memory_usage(self):
+        """
+        Return the approximate number of bytes held by the columns and the
+        description pool.
+        """
+        columns = [getattr(self, name) for name in self.COLUMNS]
+        total = sum(col.buffer_info()[1] * col.itemsize for col in columns)
+        return total + self.pool.memory_usage()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        for index in range(len(self.ids)):
+            yield TransactionRow(self, index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TransactionRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transaction index out of range")
+        return TransactionRow(self, index)
+
+    def __delitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if index < self.persisted_rows:
+            self.deleted_ids.add(self.ids[index])
+            self.touched_dates.add(self.dates[index])
+            self.persisted_rows -= 1
+        if self.aggregates is not None:
+            self.aggregates.remove(self.dates[index], self.types[index], self.cents[index])
+        del self.ids[index]
+        del self.dates[index]
+        del self.customers[index]
+        del self.cents[index]
+        del self.types[index]
+        del self.descriptions[index]
+        self.version += 1
+        if self.journal is not None:
+            self.journal.record_delete(index)
+
+    def __repr__(self):
+        return f"TransactionTable({len(self)} transactions)"